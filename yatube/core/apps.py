@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from .metrics import register_collector
+        from .tasks import task_metrics
+        from .template_backends import precompile_templates
+
+        register_collector(task_metrics)
+        if settings.TEMPLATES_PRECOMPILE:
+            precompile_templates()
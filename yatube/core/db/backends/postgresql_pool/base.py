@@ -0,0 +1,98 @@
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+POOL_OPTIONS = {
+    'pool_min_size': 1,
+    'pool_max_size': 10,
+    'pool_timeout': 30,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that borrows connections from a process-wide pool.
+
+    ``close()`` returns the connection to the pool instead of closing it,
+    so requests skip the connection handshake even with CONN_MAX_AGE = 0.
+    When all ``pool_max_size`` connections are taken, a request waits up
+    to ``pool_timeout`` seconds for one and then gets OperationalError.
+    Needs psycopg2, which is not in requirements.txt: it is only used
+    with DB_ENGINE=postgresql.
+    """
+
+    pools = {}
+    slots = {}
+    pools_lock = threading.Lock()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        self.pool_options = {
+            name: conn_params.pop(name, default)
+            for name, default in POOL_OPTIONS.items()
+        }
+        return conn_params
+
+    def get_pool(self, conn_params):
+        with self.pools_lock:
+            if self.alias not in self.pools:
+                self.pools[self.alias] = pool.ThreadedConnectionPool(
+                    self.pool_options['pool_min_size'],
+                    self.pool_options['pool_max_size'],
+                    **conn_params
+                )
+                self.slots[self.alias] = threading.BoundedSemaphore(
+                    self.pool_options['pool_max_size']
+                )
+            return self.pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        slots = self.slots[self.alias]
+        # getconn() сразу бросает PoolError, если свободных соединений нет
+        if not slots.acquire(timeout=self.pool_options['pool_timeout']):
+            raise base.Database.OperationalError(
+                'Нет свободных соединений в пуле за '
+                f'{self.pool_options["pool_timeout"]} с'
+            )
+        try:
+            connection = connection_pool.getconn()
+        except Exception:
+            slots.release()
+            raise
+        try:
+            self.prepare_connection(connection)
+        except Exception:
+            connection_pool.putconn(connection, close=True)
+            slots.release()
+            raise
+        return connection
+
+    def prepare_connection(self, connection):
+        # соединение из пула могло остаться в autocommit от прошлого запроса
+        connection.autocommit = False
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection_pool = self.pools[self.alias]
+        close = bool(self.connection.closed)
+        try:
+            if not close and not self.connection.autocommit:
+                with self.wrap_database_errors:
+                    self.connection.rollback()
+        except Exception:
+            close = True
+            raise
+        finally:
+            # место в пуле освобождается, даже если откат не удался
+            connection_pool.putconn(self.connection, close=close)
+            self.slots[self.alias].release()
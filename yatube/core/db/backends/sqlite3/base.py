@@ -0,0 +1,40 @@
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite tuned for concurrent writers.
+
+    WAL lets readers work while a post is written, ``timeout`` is the busy
+    timeout in seconds and ``BEGIN IMMEDIATE`` takes the write lock up
+    front, so concurrent transactions wait instead of failing with
+    "database is locked" on lock upgrade.
+    """
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {
+            name: kwargs.pop(name, default)
+            for name, default in PRAGMAS.items()
+        }
+        self.immediate_transactions = kwargs.pop(
+            'immediate_transactions', True
+        )
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if value is not None:
+                connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if self.immediate_transactions:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,95 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_use_primary = ContextVar('use_primary', default=False)
+_sticky_replica = ContextVar('sticky_replica', default=None)
+
+
+@contextmanager
+def use_primary(enabled=True):
+    """Send every read inside the block to the primary database."""
+    token = _use_primary.set(enabled)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+@contextmanager
+def sticky_replica():
+    """Send every read inside the block to one replica, picked once."""
+    token = _sticky_replica.set({})
+    try:
+        yield
+    finally:
+        _sticky_replica.reset(token)
+
+
+def check_connection(alias):
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        return False
+    return True
+
+
+class ReplicaRouter:
+    """Read from replicas in turn, write to the primary.
+
+    A replica that fails to connect is skipped for
+    ``DATABASE_REPLICA_RETRY_SECONDS``; with no healthy replica reads go
+    to the primary. Inside ``sticky_replica()`` all reads use the replica
+    picked for the first one.
+    """
+
+    def __init__(self, replicas=None, check=check_connection):
+        if replicas is None:
+            replicas = settings.DATABASE_REPLICAS
+        self.replicas = list(replicas)
+        self.check = check
+        self._cycle = itertools.cycle(self.replicas)
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def pick_replica(self):
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                alias = next(self._cycle)
+            now = time.monotonic()
+            if self._down_until.get(alias, 0) > now:
+                continue
+            if self.check(alias):
+                self._down_until.pop(alias, None)
+                return alias
+            self._down_until[alias] = (
+                now + settings.DATABASE_REPLICA_RETRY_SECONDS
+            )
+        return DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or _use_primary.get():
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        sticky = _sticky_replica.get()
+        if sticky is None:
+            return self.pick_replica()
+        if 'alias' not in sticky:
+            sticky['alias'] = self.pick_replica()
+        return sticky['alias']
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
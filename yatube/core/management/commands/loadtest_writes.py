@@ -0,0 +1,97 @@
+import statistics
+import threading
+import time
+import uuid
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест записи: несколько потоков одновременно '
+        'публикуют посты через posts:post_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--posts', type=int, default=50,
+                            help='Постов на поток')
+        parser.add_argument('--keep', action='store_true',
+                            help='Не удалять созданные посты')
+
+    def worker(self, user, results, errors, lock, posts):
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(user)
+        url = reverse('posts:post_create')
+        timings = []
+        failed = 0
+        try:
+            for num in range(posts):
+                started = time.perf_counter()
+                try:
+                    response = client.post(url, {'text': f'load test {num}'})
+                except DatabaseError:
+                    failed += 1
+                    continue
+                if response.status_code != HTTPStatus.FOUND:
+                    failed += 1
+                    continue
+                timings.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+        with lock:
+            results.extend(timings)
+            errors.append(failed)
+
+    # замеряется сама запись, а не ограничитель частоты
+    @override_settings(RATELIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        # свой префикс у каждого запуска: остатки упавшего не мешают новому
+        prefix = f'loadtest_{uuid.uuid4().hex[:8]}'
+        users = []
+        results = []
+        errors = []
+        lock = threading.Lock()
+        try:
+            for num in range(options['threads']):
+                users.append(
+                    User.objects.create_user(username=f'{prefix}_{num}')
+                )
+            threads = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(user, results, errors, lock, options['posts'])
+                )
+                for user in users
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options['keep']:
+                # посты авторов удаляются каскадом
+                User.objects.filter(username__startswith=f'{prefix}_').delete()
+
+        vendor = connections['default'].vendor
+        self.stdout.write(
+            f'{vendor}: {options["threads"]} потоков, '
+            f'{len(results)} постов за {elapsed:.2f} с, '
+            f'{len(results) / elapsed:.1f} постов/с, ошибок {sum(errors)}'
+        )
+        if results:
+            timings = sorted(results)
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            self.stdout.write(
+                f'p50 {statistics.median(timings) * 1000:.1f} мс, '
+                f'p99 {p99 * 1000:.1f} мс'
+            )
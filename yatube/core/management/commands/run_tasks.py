@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.tasks import due_jobs, purge_done, requeue_stale, work
+
+PURGE_EVERY = 60
+
+
+class Command(BaseCommand):
+    help = 'Запускает отдельные процессы-обработчики фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Пауза между опросами пустой очереди, с')
+        parser.add_argument('--once', action='store_true',
+                            help='Выйти, когда очередь опустеет')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        done = 0
+        purged = 0
+        last_purge = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                if last_purge is None or (
+                    time.monotonic() - last_purge > PURGE_EVERY
+                ):
+                    purged += purge_done(settings.TASKS_DONE_RETENTION_SECONDS)
+                    last_purge = time.monotonic()
+                requeue_stale(settings.TASKS_STALE_SECONDS)
+                jobs = due_jobs(workers * 4)
+                if jobs:
+                    list(pool.map(work, jobs))
+                    done += len(jobs)
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано задач: {done}, удалено выполненных: {purged}'
+        ))
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+MAX_RECORDED_QUERIES = 200
+
+_current = ContextVar('request_metrics', default=None)
+_collectors = []
+
+
+class RequestMetrics:
+    """Costs of a single request, filled while it is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.queries = []
+
+    def add_query(self, sql, duration):
+        self.sql_count += 1
+        self.sql_time += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((duration, sql))
+
+    def slowest_queries(self, limit=5):
+        return sorted(self.queries, key=lambda query: -query[0])[:limit]
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def record_template_time(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.template_time += duration
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.add_query(sql, time.perf_counter() - started)
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency = 0.0
+        self.count = 0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = defaultdict(RouteStats)
+
+    def observe(self, route, method, status, latency, metrics):
+        with self._lock:
+            stats = self.routes[route]
+            stats.requests[(method, status)] += 1
+            stats.count += 1
+            stats.latency += latency
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.buckets[index] += 1
+            stats.sql_count += metrics.sql_count
+            stats.sql_time += metrics.sql_time
+            stats.template_time += metrics.template_time
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+    def render(self):
+        """Prometheus text exposition of every route and collector."""
+        lines = []
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines += _header('yatube_requests_total', 'counter',
+                             'Обработанные запросы')
+            for route, stats in routes:
+                for (method, status), value in sorted(stats.requests.items()):
+                    lines.append(_sample('yatube_requests_total', value,
+                                         route=route, method=method,
+                                         status=status))
+            lines += _header('yatube_request_duration_seconds', 'histogram',
+                             'Время ответа')
+            for route, stats in routes:
+                for bound, value in zip(LATENCY_BUCKETS, stats.buckets):
+                    lines.append(_sample(
+                        'yatube_request_duration_seconds_bucket', value,
+                        route=route, le=bound
+                    ))
+                lines.append(_sample(
+                    'yatube_request_duration_seconds_bucket', stats.count,
+                    route=route, le='+Inf'
+                ))
+                lines.append(_sample('yatube_request_duration_seconds_sum',
+                                     stats.latency, route=route))
+                lines.append(_sample('yatube_request_duration_seconds_count',
+                                     stats.count, route=route))
+            for name, attribute, kind, help_text in (
+                ('yatube_sql_queries_total', 'sql_count', 'counter',
+                 'SQL-запросы'),
+                ('yatube_sql_duration_seconds_total', 'sql_time', 'counter',
+                 'Время SQL-запросов'),
+                ('yatube_template_duration_seconds_total', 'template_time',
+                 'counter', 'Время отрисовки шаблонов'),
+            ):
+                lines += _header(name, kind, help_text)
+                for route, stats in routes:
+                    lines.append(_sample(name, getattr(stats, attribute),
+                                         route=route))
+        for collector in _collectors:
+            for name, kind, help_text, samples in collector():
+                lines += _header(name, kind, help_text)
+                lines += [_sample(name, value, **labels)
+                          for labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+def register_collector(collector):
+    """Add metrics of another subsystem to the exposition.
+
+    ``collector()`` yields ``(name, type, help, [(labels, value), ...])``.
+    """
+    _collectors.append(collector)
+    return collector
+
+
+def _header(name, kind, help_text):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+
+def _sample(name, value, **labels):
+    if not labels:
+        return f'{name} {value}'
+    rendered = ','.join(
+        '{}="{}"'.format(
+            key, str(label).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for key, label in labels.items()
+    )
+    return f'{name}{{{rendered}}} {value}'
+
+
+registry = Registry()
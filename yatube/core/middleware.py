@@ -0,0 +1,88 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .db.routers import sticky_replica, use_primary
+from .metrics import finish_request, registry, sql_wrapper, start_request
+
+slow_logger = logging.getLogger('yatube.slow_requests')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'use_primary'
+
+
+class ReplicaPinningMiddleware:
+    """Keep writers on the primary until the replicas catch up.
+
+    Unsafe requests read from the primary and set a short-lived cookie;
+    while it lives the user's reads go to the primary too, so they see
+    their own posts. The other requests read from one replica each, so
+    the queries of a page see the same state.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unsafe = request.method not in SAFE_METHODS
+        with use_primary(unsafe or PIN_COOKIE in request.COOKIES):
+            with sticky_replica():
+                response = self.get_response(request)
+        if unsafe:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """Count SQL queries, SQL time, template time and latency per route.
+
+    Requests slower than METRICS_SLOW_REQUEST_SECONDS or running more than
+    METRICS_SLOW_REQUEST_QUERIES queries are logged with their slowest SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            finish_request(token)
+        latency = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        registry.observe(
+            route, request.method, response.status_code, latency, metrics
+        )
+        if (
+            latency > settings.METRICS_SLOW_REQUEST_SECONDS
+            or metrics.sql_count > settings.METRICS_SLOW_REQUEST_QUERIES
+        ):
+            self.log_slow_request(request, route, latency, metrics)
+        return response
+
+    def log_slow_request(self, request, route, latency, metrics):
+        queries = '\n'.join(
+            f'  {duration * 1000:.1f} мс: {sql}'
+            for duration, sql in metrics.slowest_queries()
+        )
+        slow_logger.warning(
+            'Медленный запрос %s %s (%s): %.3f с, SQL %d шт. за %.3f с, '
+            'шаблоны %.3f с\n%s',
+            request.method, request.get_full_path(), route, latency,
+            metrics.sql_count, metrics.sql_time, metrics.template_time,
+            queries,
+        )
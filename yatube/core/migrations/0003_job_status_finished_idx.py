@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'finished'], name='job_status_finished_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A queued call of a background task, see ``core.tasks``."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    args = models.TextField('Аргументы', default='[]')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveIntegerField('Всего попыток', default=3)
+    created = models.DateTimeField('Создана', default=timezone.now)
+    run_at = models.DateTimeField('Запустить после', default=timezone.now)
+    started = models.DateTimeField('Запущена', null=True, blank=True)
+    finished = models.DateTimeField('Завершена', null=True, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'],
+                         name='job_status_run_at_idx'),
+            models.Index(fields=['status', 'finished'],
+                         name='job_status_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket of ``core.ratelimit.DatabaseStorage``."""
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated = models.FloatField('Время обновления, unix')
+
+    def __str__(self):
+        return f'{self.key}: {self.tokens:.2f}'
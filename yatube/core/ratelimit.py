@@ -0,0 +1,229 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.db.models.functions import Least
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+from .models import RateLimitBucket
+
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """``'10/m'`` -> bucket capacity and tokens refilled per second."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+def refill(tokens, updated, now, capacity, rate):
+    """Take a token; returns the new token count and seconds to wait."""
+    tokens = min(capacity, tokens + max(0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / rate
+
+
+class LocMemStorage:
+    """Buckets of a single process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, wait = refill(tokens, updated, now, capacity, rate)
+            self._buckets[key] = (tokens, max(updated, now))
+        return wait
+
+    def refund(self, key, capacity, rate):
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + 1), updated)
+
+
+class CacheStorage:
+    """Buckets in a shared cache, guarded by an ``add()`` lock.
+
+    A request that cannot get the lock in ``LOCK_TIMEOUT`` seconds is
+    told to wait that long instead of touching the bucket unlocked.
+    """
+
+    LOCK_TIMEOUT = 1
+
+    @property
+    def cache(self):
+        return caches[settings.RATELIMIT_CACHE]
+
+    def acquire(self, lock_key):
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while not self.cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def take(self, key, capacity, rate, now):
+        lock_key = f'{key}:lock'
+        if not self.acquire(lock_key):
+            return self.LOCK_TIMEOUT
+        try:
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens, wait = refill(tokens, updated, now, capacity, rate)
+            self.set(key, tokens, max(updated, now), capacity, rate)
+        finally:
+            self.cache.delete(lock_key)
+        return wait
+
+    def refund(self, key, capacity, rate):
+        lock_key = f'{key}:lock'
+        # без блокировки токен не возвращается: лучше лишний отказ
+        if not self.acquire(lock_key):
+            return
+        try:
+            bucket = self.cache.get(key)
+            if bucket is not None:
+                tokens, updated = bucket
+                tokens = min(capacity, tokens + 1)
+                self.set(key, tokens, updated, capacity, rate)
+        finally:
+            self.cache.delete(lock_key)
+
+    def set(self, key, tokens, updated, capacity, rate):
+        self.cache.set(
+            key, (tokens, updated), math.ceil(capacity / rate) + 1
+        )
+
+
+class DatabaseStorage:
+    """Buckets in ``core_ratelimitbucket``, locked row by row."""
+
+    def take(self, key, capacity, rate, now):
+        using = router.db_for_write(RateLimitBucket)
+        buckets = RateLimitBucket.objects.using(using)
+        with transaction.atomic(using=using):
+            bucket = buckets.select_for_update().filter(key=key).first()
+            if bucket is None:
+                try:
+                    with transaction.atomic(using=using):
+                        bucket = buckets.create(
+                            key=key, tokens=capacity, updated=now
+                        )
+                except IntegrityError:
+                    bucket = buckets.select_for_update().get(key=key)
+            bucket.tokens, wait = refill(
+                bucket.tokens, bucket.updated, now, capacity, rate
+            )
+            bucket.updated = max(bucket.updated, now)
+            bucket.save(using=using)
+        return wait
+
+    def refund(self, key, capacity, rate):
+        using = router.db_for_write(RateLimitBucket)
+        RateLimitBucket.objects.using(using).filter(key=key).update(
+            tokens=Least(F('tokens') + 1, capacity)
+        )
+
+
+_storages = {}
+
+
+def get_storage():
+    path = settings.RATELIMIT_STORAGE
+    if path not in _storages:
+        _storages[path] = import_string(path)()
+    return _storages[path]
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def request_key(request, kind):
+    """Bucket of the request for a rule; every rule has its own keys."""
+    if kind == 'user':
+        if request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        # у анонима свой бакет, не общий с правилом 'ip'
+        return f'user-anon:{client_ip(request)}'
+    if kind == 'route':
+        return 'route'
+    return f'ip:{client_ip(request)}'
+
+
+def check(request, route, rules):
+    """Take a token from each bucket; 429 if one of them is empty.
+
+    Tokens already taken for a rejected request are put back, so it does
+    not drain the buckets of the other rules.
+    """
+    if not settings.RATELIMIT_ENABLED:
+        return None
+    storage = get_storage()
+    now = time.time()
+    taken = []
+    for kind, rate in rules:
+        capacity, per_second = parse_rate(rate)
+        key = f'ratelimit:{route}:{request_key(request, kind)}'
+        wait = storage.take(key, capacity, per_second, now)
+        if wait:
+            break
+        taken.append((key, capacity, per_second))
+    else:
+        return None
+    for key, capacity, per_second in taken:
+        storage.refund(key, capacity, per_second)
+    response = HttpResponse(
+        'Слишком много запросов, попробуйте позже', status=429
+    )
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def ratelimit(*rules, methods=UNSAFE_METHODS):
+    """Limit a view: ``@ratelimit(('user', '10/m'), ('ip', '100/h'))``."""
+    def decorator(view):
+        route = f'{view.__module__}.{view.__qualname__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                limited = check(request, route, rules)
+                if limited is not None:
+                    return limited
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimitMiddleware:
+    """Apply RATELIMIT_ROUTES, ``{view name: [(key, rate), ...]}``.
+
+    Only unsafe methods are limited, so forms still open.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in UNSAFE_METHODS:
+            return None
+        route = request.resolver_match.view_name
+        rules = settings.RATELIMIT_ROUTES.get(route)
+        if not rules:
+            return None
+        return check(request, route, rules)
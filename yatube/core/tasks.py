@@ -0,0 +1,231 @@
+import json
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .db.routers import use_primary
+from .models import Job
+
+logger = logging.getLogger('yatube.tasks')
+
+_tasks = {}
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class TaskStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = {}
+        self.wait = 0.0
+        self.run = 0.0
+        self.count = 0
+
+    def observe(self, name, result, wait, run):
+        with self._lock:
+            self.jobs[(name, result)] = self.jobs.get((name, result), 0) + 1
+            self.wait += wait
+            self.run += run
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.jobs.clear()
+            self.wait = self.run = 0.0
+            self.count = 0
+
+
+stats = TaskStats()
+
+
+class Task:
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.max_attempts = max_attempts
+        self.name = f'{func.__module__}.{func.__qualname__}'
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def delay(self, *args):
+        """Run the task after the current transaction commits.
+
+        The job row is written in the caller's transaction, so it is
+        either queued together with the data it refers to or not at all.
+        Arguments must be JSON serializable.
+        """
+        if settings.TASKS_EAGER:
+            return self.func(*args)
+        job = Job.objects.create(
+            name=self.name,
+            args=json.dumps(args),
+            max_attempts=self.max_attempts,
+        )
+        if settings.TASKS_WORKERS:
+            transaction.on_commit(lambda: submit(job.pk))
+        return job
+
+
+def task(func=None, *, max_attempts=3):
+    """Register a function as a background task with ``.delay()``."""
+    if func is None:
+        return lambda func: task(func, max_attempts=max_attempts)
+    registered = Task(func, max_attempts)
+    _tasks[registered.name] = registered
+    return registered
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.TASKS_WORKERS,
+                thread_name_prefix='yatube-tasks',
+            )
+        return _pool
+
+
+def submit(job_id, delay=0):
+    if delay:
+        timer = threading.Timer(delay, submit, args=(job_id,))
+        timer.daemon = True
+        timer.start()
+        return
+    get_pool().submit(_run_in_pool, job_id)
+
+
+def _run_in_pool(job_id):
+    delay = work(job_id)
+    if delay is not None:
+        submit(job_id, delay)
+
+
+def claim(job_id):
+    """Mark a due job as running; False if another worker took it."""
+    return bool(Job.objects.filter(
+        pk=job_id, status=Job.PENDING, run_at__lte=timezone.now()
+    ).update(
+        status=Job.RUNNING,
+        started=timezone.now(),
+        attempts=F('attempts') + 1,
+    ))
+
+
+def retry_delay(attempts):
+    return settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def run_job(job_id):
+    """Execute a queued job; returns the delay of a retry or None."""
+    with use_primary():
+        if not claim(job_id):
+            return None
+        return _execute(Job.objects.get(pk=job_id))
+
+
+def work(job_id):
+    """``run_job`` for worker threads, which own their connections."""
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _execute(job):
+    started = time.perf_counter()
+    wait = (job.started - job.run_at).total_seconds()
+    task = _tasks.get(job.name)
+    try:
+        if task is None:
+            raise LookupError(f'Неизвестная задача {job.name}')
+        task.func(*json.loads(job.args))
+    except Exception:
+        logger.exception('Задача %s #%s упала', job.name, job.pk)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            job.status = Job.PENDING
+            job.run_at = timezone.now() + timedelta(seconds=delay)
+            result = 'retry'
+        else:
+            delay = None
+            job.status = Job.FAILED
+            job.finished = timezone.now()
+            result = 'failed'
+        job.save(update_fields=['status', 'run_at', 'finished', 'error'])
+        stats.observe(job.name, result, wait, time.perf_counter() - started)
+        return delay
+    job.status = Job.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'finished'])
+    stats.observe(job.name, 'done', wait, time.perf_counter() - started)
+    return None
+
+
+def due_jobs(limit):
+    return list(Job.objects.filter(
+        status=Job.PENDING, run_at__lte=timezone.now()
+    ).order_by('run_at').values_list('pk', flat=True)[:limit])
+
+
+def requeue_stale(seconds):
+    """Return jobs of crashed workers back to the queue.
+
+    Jobs that used up their attempts fail instead.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started__lt=timezone.now() - timedelta(seconds=seconds),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        finished=timezone.now(),
+        error='Обработчик не завершил последнюю попытку',
+    )
+    return stale.update(status=Job.PENDING)
+
+
+def purge_done(seconds, batch_size=1000):
+    """Delete jobs finished more than ``seconds`` ago; number deleted."""
+    done = Job.objects.filter(
+        status=Job.DONE,
+        finished__lt=timezone.now() - timedelta(seconds=seconds),
+    )
+    deleted = 0
+    while True:
+        pks = list(done.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        deleted += Job.objects.filter(pk__in=pks).delete()[0]
+
+
+def task_metrics():
+    depth = Job.objects.filter(status=Job.PENDING).count()
+    yield 'yatube_tasks_queue_depth', 'gauge', 'Задачи в очереди', [
+        ({}, depth)
+    ]
+    with stats._lock:
+        jobs = sorted(stats.jobs.items())
+        wait, run, count = stats.wait, stats.run, stats.count
+    yield 'yatube_tasks_total', 'counter', 'Выполненные задачи', [
+        ({'task': name, 'result': result}, value)
+        for (name, result), value in jobs
+    ]
+    yield 'yatube_tasks_wait_seconds_total', 'counter', (
+        'Время задач в очереди'
+    ), [({}, wait)]
+    yield 'yatube_tasks_run_seconds_total', 'counter', (
+        'Время выполнения задач'
+    ), [({}, run)]
+    yield 'yatube_tasks_runs_total', 'counter', 'Запуски задач', [
+        ({}, count)
+    ]
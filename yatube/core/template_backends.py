@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.template import TemplateDoesNotExist, engines
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import record_template_time
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template_time(time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django templates that report their render time to core.metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.html', '.txt', '.xml')):
+                yield os.path.relpath(os.path.join(root, name), directory)
+
+
+def precompile_templates():
+    """Parse every project template so the cached loader keeps them.
+
+    Syntax errors surface at startup instead of on the first request.
+    Returns the number of compiled templates.
+    """
+    count = 0
+    for backend in engines.all():
+        for directory in getattr(backend, 'dirs', ()):
+            for name in template_names(directory):
+                backend.get_template(name)
+                count += 1
+    return count
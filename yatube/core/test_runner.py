@@ -0,0 +1,33 @@
+"""Test runner that starts every test with empty caches.
+
+Test databases roll back after each test and reuse primary keys, so
+entries cached by an earlier test (post fragments keyed by id and
+version, pages, rate limits) would otherwise leak into the next one.
+"""
+import unittest
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.runner import DebugSQLTextTestResult, DiscoverRunner
+
+
+class ClearCachesMixin:
+    def startTest(self, test):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        super().startTest(test)
+
+
+class ClearCachesTestResult(ClearCachesMixin, unittest.TextTestResult):
+    pass
+
+
+class ClearCachesDebugSQLTestResult(ClearCachesMixin, DebugSQLTextTestResult):
+    pass
+
+
+class ClearCachesRunner(DiscoverRunner):
+    def get_resultclass(self):
+        if self.debug_sql:
+            return ClearCachesDebugSQLTestResult
+        return ClearCachesTestResult
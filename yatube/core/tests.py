@@ -1,5 +1,48 @@
-from django.test import TestCase
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
 from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.template import TemplateSyntaxError
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Follow, Post, TimelineEntry, User
+from .db.routers import ReplicaRouter, use_primary
+from .management.commands.loadtest_writes import Command as LoadTest
+from .metrics import registry
+from .middleware import PIN_COOKIE, ReplicaPinningMiddleware
+from .models import Job
+from .ratelimit import (
+    CacheStorage, DatabaseStorage, LocMemStorage, ratelimit
+)
+from .tasks import due_jobs, requeue_stale, run_job, task
+from .template_backends import precompile_templates
+from .test_runner import ClearCachesTestResult
+
+calls = []
+
+
+@task(max_attempts=2)
+def record_call(value):
+    if value == 'fail':
+        raise ValueError(value)
+    calls.append(value)
 
 
 class ViewTestClass(TestCase):
@@ -11,3 +54,416 @@ class ViewTestClass(TestCase):
         response = self.client.get('/this_page_does_not_exist/')
         self.assertEqual(response.status_code, self.response_404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class LoadTestCommandTests(TestCase):
+    def loadtest_users(self):
+        return User.objects.filter(username__startswith='loadtest_')
+
+    def test_users_are_removed_after_failure(self):
+        with mock.patch.object(
+            threading.Thread, 'start', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command('loadtest_writes', threads=2, stdout=StringIO())
+        self.assertFalse(self.loadtest_users().exists())
+
+    def test_runs_do_not_clash(self):
+        output = StringIO()
+        with mock.patch.object(LoadTest, 'worker'):
+            call_command(
+                'loadtest_writes', threads=2, keep=True, stdout=output
+            )
+            call_command('loadtest_writes', threads=2, stdout=output)
+        self.assertEqual(self.loadtest_users().count(), 2)
+        self.assertEqual(output.getvalue().count('потоков'), 2)
+
+
+@override_settings(DATABASE_REPLICA_RETRY_SECONDS=30)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.healthy = {'replica_0': True, 'replica_1': True}
+        self.router = ReplicaRouter(
+            replicas=['replica_0', 'replica_1'],
+            check=lambda alias: self.healthy[alias],
+        )
+
+    def test_round_robin_reads_and_primary_writes(self):
+        reads = [self.router.db_for_read(Post) for _ in range(4)]
+        self.assertEqual(
+            reads, ['replica_0', 'replica_1', 'replica_0', 'replica_1']
+        )
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_unhealthy_replica_is_skipped(self):
+        self.healthy['replica_0'] = False
+        reads = {self.router.db_for_read(Post) for _ in range(4)}
+        self.assertEqual(reads, {'replica_1'})
+        self.healthy['replica_1'] = False
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_unhealthy_replica_is_retried_later(self):
+        self.healthy['replica_0'] = False
+        self.router.db_for_read(Post)
+        self.healthy['replica_0'] = True
+        later = time.monotonic() + 31
+        with mock.patch('core.db.routers.time.monotonic', return_value=later):
+            reads = {self.router.db_for_read(Post) for _ in range(2)}
+        self.assertEqual(reads, {'replica_0', 'replica_1'})
+
+    def test_pinned_reads_go_to_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_REPLICA_PIN_SECONDS=5)
+    def test_middleware_pins_after_write(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(view)
+        factory = RequestFactory()
+        middleware(factory.get('/'))
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        middleware(request)
+        self.assertEqual(seen, ['replica_0', 'default', 'default'])
+
+    def test_one_replica_per_request(self):
+        seen = []
+
+        def view(request):
+            seen.append({self.router.db_for_read(Post) for _ in range(3)})
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(view)
+        for _ in range(2):
+            middleware(RequestFactory().get('/'))
+        self.assertEqual(seen, [{'replica_0'}, {'replica_1'}])
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica_0'],
+    DATABASE_ROUTERS=['core.db.routers.ReplicaRouter'],
+    MIDDLEWARE=(
+        settings.MIDDLEWARE[:2]
+        + ['core.middleware.ReplicaPinningMiddleware']
+        + settings.MIDDLEWARE[2:]
+    ),
+    POSTS_PAGE_CACHE_TIMEOUT=0,
+)
+class SQLiteReplicaTests(TestCase):
+    """Primary and replica as two SQLite files with different contents."""
+
+    databases = {'default', 'replica_0'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.replica = os.path.join(cls.directory, 'replica.sqlite3')
+        # схема из тестовой базы; группа есть только на «отставшей» реплике
+        replica = sqlite3.connect(cls.replica)
+        connection.ensure_connection()
+        connection.connection.backup(replica)
+        replica.execute(
+            'INSERT INTO posts_group (title, slug, description, posts_count) '
+            "VALUES ('replica', 'replica', '', 0)"
+        )
+        replica.commit()
+        replica.close()
+        # так же, как реплики из DB_REPLICAS в settings.py
+        default = connections.databases['default']
+        connections.databases['replica_0'] = dict(
+            default,
+            NAME=f'file:{cls.replica}?mode=ro',
+            OPTIONS=dict(
+                default['OPTIONS'],
+                journal_mode=None,
+                immediate_transactions=False,
+            ),
+            TEST={},
+        )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica_0'].close()
+        del connections.databases['replica_0']
+        if hasattr(connections._connections, 'replica_0'):
+            delattr(connections._connections, 'replica_0')
+        shutil.rmtree(cls.directory)
+
+    def test_get_reads_replica_and_post_pins_primary(self):
+        url = reverse('posts:group_list', kwargs={'slug': 'replica'})
+        with CaptureQueriesContext(connections['replica_0']) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(queries.captured_queries)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        with CaptureQueriesContext(connections['replica_0']) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertFalse(queries.captured_queries)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+
+    def test_routes_are_measured(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        stats = registry.routes['posts:index']
+        self.assertEqual(stats.count, 2)
+        self.assertGreater(stats.sql_count, 0)
+        self.assertGreater(stats.template_time, 0)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        body = response.content.decode()
+        self.assertIn(
+            'yatube_requests_total{route="posts:index",method="GET",'
+            'status="200"} 2', body
+        )
+        self.assertIn('yatube_sql_queries_total{route="posts:index"}', body)
+        self.assertIn('yatube_cache_requests_total', body)
+
+    def test_metrics_are_internal(self):
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(METRICS_SLOW_REQUEST_QUERIES=0)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('yatube.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertIn('posts:index', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+@override_settings(TASKS_EAGER=False, TASKS_WORKERS=0, TASKS_RETRY_DELAY=0)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_later(self):
+        job = record_call.delay('test')
+        self.assertEqual(calls, [])
+        self.assertIsNone(run_job(job.pk))
+        self.assertEqual(calls, ['test'])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 1))
+        self.assertIsNone(run_job(job.pk))
+        self.assertEqual(calls, ['test'])
+
+    def test_failed_job_is_retried(self):
+        job = record_call.delay('fail')
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            self.assertEqual(run_job(job.pk), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            self.assertIsNone(run_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIn('ValueError', job.error)
+
+    def test_queued_side_effects_and_metrics(self):
+        reader = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='author')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.create(author=author, text='test_text')
+        self.assertFalse(TimelineEntry.objects.exists())
+        with override_settings(METRICS_ALLOWED_IPS=['127.0.0.1']):
+            response = self.client.get(reverse('metrics'))
+        self.assertContains(response, 'yatube_tasks_queue_depth 2')
+
+        for job_id in due_jobs(10):
+            run_job(job_id)
+        self.assertEqual(TimelineEntry.objects.get().reader, reader)
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+    def test_stale_jobs(self):
+        started = timezone.now() - timedelta(seconds=3600)
+        retried = record_call.delay('test')
+        exhausted = record_call.delay('test')
+        Job.objects.filter(pk=retried.pk).update(
+            status=Job.RUNNING, started=started, attempts=1
+        )
+        Job.objects.filter(pk=exhausted.pk).update(
+            status=Job.RUNNING, started=started, attempts=2
+        )
+        self.assertEqual(requeue_stale(600), 1)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retried.status, Job.PENDING)
+        self.assertEqual(exhausted.status, Job.FAILED)
+        self.assertEqual(due_jobs(10), [retried.pk])
+
+    @override_settings(TASKS_DONE_RETENTION_SECONDS=3600)
+    def test_run_tasks_purges_done_jobs(self):
+        jobs = [record_call.delay(value) for value in ('old', 'fail', 'new')]
+        old, failed, fresh = [job.pk for job in jobs]
+        Job.objects.update(status=Job.DONE, finished=timezone.now())
+        Job.objects.filter(pk__in=[old, failed]).update(
+            finished=timezone.now() - timedelta(days=2)
+        )
+        Job.objects.filter(pk=failed).update(status=Job.FAILED)
+        output = StringIO()
+        call_command('run_tasks', once=True, workers=1, stdout=output)
+        self.assertIn('удалено выполненных: 1', output.getvalue())
+        self.assertEqual(
+            set(Job.objects.values_list('pk', flat=True)), {failed, fresh}
+        )
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def take_all(self, storage, attempts, now=1000.0):
+        return [
+            storage.take('test', 3, 3 / 60, now) for _ in range(attempts)
+        ]
+
+    def test_token_bucket(self):
+        for storage in (LocMemStorage(), CacheStorage(), DatabaseStorage()):
+            with self.subTest(storage=type(storage).__name__):
+                storage.take('test', 3, 3 / 60, 0)
+                waits = self.take_all(storage, 4)
+                self.assertEqual(waits[:3], [0, 0, 0])
+                self.assertAlmostEqual(waits[3], 20)
+                self.assertEqual(storage.take('test', 3, 3 / 60, 1020), 0)
+                self.assertGreater(storage.take('test', 3, 3 / 60, 1020), 0)
+
+    def test_refund(self):
+        for storage in (LocMemStorage(), CacheStorage(), DatabaseStorage()):
+            with self.subTest(storage=type(storage).__name__):
+                self.take_all(storage, 3)
+                storage.refund('test', 3, 3 / 60)
+                self.assertEqual(self.take_all(storage, 2)[0], 0)
+                for _ in range(5):
+                    storage.refund('test', 3, 3 / 60)
+                waits = self.take_all(storage, 4)
+                self.assertEqual(waits[:3], [0, 0, 0])
+                self.assertGreater(waits[3], 0)
+
+    def test_concurrent_requests(self):
+        for storage in (LocMemStorage(), CacheStorage()):
+            with self.subTest(storage=type(storage).__name__):
+                allowed = []
+
+                def worker():
+                    for _ in range(10):
+                        if not storage.take('concurrent', 25, 1e-9, 0):
+                            allowed.append(1)
+
+                threads = [threading.Thread(target=worker) for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertEqual(len(allowed), 25)
+
+    @override_settings(
+        RATELIMIT_STORAGE='core.ratelimit.LocMemStorage',
+        RATELIMIT_ROUTES={'posts:post_create': [('user', '2/m')]},
+    )
+    def test_middleware_returns_429(self):
+        user = User.objects.create_user(username='test_user')
+        self.client.force_login(user)
+        url = reverse('posts:post_create')
+        for _ in range(2):
+            response = self.client.post(url, {'text': 'test_text'})
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.client.post(url, {'text': 'test_text'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(int(response['Retry-After']), 30)
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        self.assertEqual(Post.objects.count(), 2)
+
+    @override_settings(RATELIMIT_STORAGE='core.ratelimit.LocMemStorage')
+    def test_decorator(self):
+        @ratelimit(('user', '2/m'), ('ip', '3/m'))
+        def view(request):
+            return HttpResponse()
+
+        def post(**extra):
+            request = RequestFactory().post('/', **extra)
+            request.user = AnonymousUser()
+            return view(request).status_code
+
+        # у анонима правила 'user' и 'ip' тратят разные бакеты
+        self.assertEqual(
+            [post() for _ in range(3)],
+            [HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.TOO_MANY_REQUESTS]
+        )
+        self.assertEqual(post(REMOTE_ADDR='10.0.0.2'), HTTPStatus.OK)
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.assertEqual(view(request).status_code, HTTPStatus.OK)
+
+    @override_settings(RATELIMIT_STORAGE='core.ratelimit.LocMemStorage')
+    def test_rejected_requests_keep_other_buckets(self):
+        @ratelimit(('ip', '3/m'), ('user', '1/m'))
+        def view(request):
+            return HttpResponse()
+
+        def post(user):
+            request = RequestFactory().post('/')
+            request.user = user
+            return view(request).status_code
+
+        first = User.objects.create_user(username='first')
+        second = User.objects.create_user(username='second')
+        self.assertEqual(
+            [post(first) for _ in range(5)],
+            [HTTPStatus.OK] + [HTTPStatus.TOO_MANY_REQUESTS] * 4
+        )
+        # отказы правила 'user' не потратили общий бакет адреса
+        self.assertEqual(post(second), HTTPStatus.OK)
+
+    def test_cache_storage_fails_closed(self):
+        storage = CacheStorage()
+        storage.cache.add('test:lock', 1, 60)
+        with mock.patch.object(CacheStorage, 'LOCK_TIMEOUT', 0.01):
+            self.assertEqual(storage.take('test', 3, 3 / 60, 0), 0.01)
+        self.assertIsNone(storage.cache.get('test'))
+
+
+class PrecompileTemplatesTests(SimpleTestCase):
+    def test_project_templates_compile(self):
+        self.assertGreater(precompile_templates(), 0)
+
+    def test_syntax_error_fails_fast(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'broken.html'), 'w') as file:
+                file.write('{% if %}')
+            templates = [{
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'DIRS': [directory],
+            }]
+            with override_settings(TEMPLATES=templates):
+                with self.assertRaises(TemplateSyntaxError):
+                    precompile_templates()
+
+
+class ClearCachesRunnerTests(SimpleTestCase):
+    def test_each_test_starts_with_empty_caches(self):
+        for alias in settings.CACHES:
+            caches[alias].set('leftover', 1)
+        result = ClearCachesTestResult(StringIO(), True, 0)
+        result.startTest(self)
+        result.stopTest(self)
+        for alias in settings.CACHES:
+            with self.subTest(alias=alias):
+                self.assertIsNone(caches[alias].get('leftover'))
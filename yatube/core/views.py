@@ -1,4 +1,12 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
+
+from .metrics import registry
+
+MEDIA_MAX_AGE = 60 * 60 * 24 * 365
 
 
 def page_not_found(request, exception):
@@ -15,3 +23,21 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@cache_control(public=True, max_age=MEDIA_MAX_AGE, immutable=True)
+def media(request, path):
+    """Uploaded files, when no web server serves MEDIA_ROOT.
+
+    Their names are content hashes, so browsers may keep them for a year.
+    """
+    return serve(request, path, document_root=settings.MEDIA_ROOT)
@@ -1,13 +1,177 @@
-from django.contrib import admin
-from .models import Post, Group
+import time
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Max, Min
+from django.template.response import TemplateResponse
+from . import bulk
+from .models import Post, Group, User
+from .paginators import EstimatedCountPaginator
+from .search import search_posts
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete that labels the chosen value with ``loaded``.
+
+    The stock widget queries the chosen object once per changelist row,
+    though ``list_select_related`` has already joined it.
+    """
+
+    loaded = None
+
+    def optgroups(self, name, value, attr=None):
+        loaded = self.loaded
+        if loaded is None or {str(v) for v in value if v} != {str(loaded.pk)}:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, loaded.pk, self.choices.field.label_from_instance(loaded),
+            True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class LoadedRelationsFormMixin:
+    """Hand the row's related objects to its autocomplete widgets."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, LoadedAutocompleteSelect):
+                widget.loaded = getattr(self.instance, name)
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Группа',
+        empty_label='Без группы'
+    )
+
+
+class DateRangeForm(forms.Form):
+    since = forms.DateTimeField(label='С')
+    until = forms.DateTimeField(label='По')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        since, until = cleaned_data.get('since'), cleaned_data.get('until')
+        if since and until and since > until:
+            raise forms.ValidationError('Начало позже конца')
+        return cleaned_data
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
     list_editable = ('group',)
+    # вместо <select> со всеми авторами и группами в каждой строке
+    autocomplete_fields = ('author', 'group')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('move_to_group', 'delete_by_author', 'delete_by_date_range')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', LoadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        form = super().get_changelist_form(request, **kwargs)
+        return type(form.__name__, (LoadedRelationsFormMixin, form), {})
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def bulk_form(self, request, form_class, **kwargs):
+        """The form of an action; bound once the user confirmed it."""
+        if 'apply' in request.POST:
+            return form_class(request.POST, **kwargs)
+        return form_class(**kwargs)
+
+    def confirm_page(self, request, queryset, title, form=None, **context):
+        select_across = request.POST.get('select_across') == '1'
+        return TemplateResponse(request, 'admin/posts/post/bulk_action.html', {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'action': request.POST['action'],
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            'select_across': select_across,
+            'selected': (
+                [] if select_across
+                else queryset.values_list('pk', flat=True)
+            ),
+            **context,
+        })
+
+    def report(self, request, message, started):
+        elapsed = time.perf_counter() - started
+        self.message_user(
+            request, f'{message} за {elapsed:.2f} с', messages.SUCCESS
+        )
+
+    def move_to_group(self, request, queryset):
+        form = self.bulk_form(request, MoveToGroupForm)
+        if not form.is_valid():
+            return self.confirm_page(
+                request, queryset, 'Перенести посты в группу', form,
+                count=queryset.count(),
+            )
+        started = time.perf_counter()
+        moved = bulk.move_to_group(queryset, form.cleaned_data['group'])
+        self.report(request, f'Перенесено постов: {moved}', started)
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_by_author(self, request, queryset):
+        authors = User.objects.filter(
+            pk__in=queryset.order_by().values('author_id')
+        )
+        posts = Post.objects.filter(author__in=authors)
+        if 'apply' not in request.POST:
+            return self.confirm_page(
+                request, queryset, 'Удалить все посты авторов',
+                count=posts.count(),
+                authors=authors.values_list('username', flat=True),
+            )
+        started = time.perf_counter()
+        deleted = bulk.delete_posts(posts)
+        self.report(request, f'Удалено постов: {deleted}', started)
+    delete_by_author.short_description = 'Удалить все посты их авторов'
+    delete_by_author.allowed_permissions = ('delete',)
+
+    def delete_by_date_range(self, request, queryset):
+        bounds = queryset.order_by().aggregate(
+            since=Min('pub_date'), until=Max('pub_date')
+        )
+        form = self.bulk_form(request, DateRangeForm, initial=bounds)
+        if not form.is_valid():
+            return self.confirm_page(
+                request, queryset, 'Удалить посты за период', form
+            )
+        posts = Post.objects.filter(pub_date__range=(
+            form.cleaned_data['since'], form.cleaned_data['until']
+        ))
+        started = time.perf_counter()
+        deleted = bulk.delete_posts(posts)
+        self.report(request, f'Удалено постов: {deleted}', started)
+    delete_by_date_range.short_description = 'Удалить посты за период'
+    delete_by_date_range.allowed_permissions = ('delete',)
 
 
 class GroupAdmin(admin.ModelAdmin):
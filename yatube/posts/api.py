@@ -0,0 +1,169 @@
+"""Read-only JSON API for mobile clients, mounted at ``/api/v1/``.
+
+Rows are read with ``values()`` and serialized as plain dicts, so no
+model instances are built. ``?fields=`` limits the columns selected.
+"""
+from functools import wraps
+from http import HTTPStatus
+
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .models import Group, Post, User
+from .paginators import CursorPaginator, InvalidCursor
+from .utils import NUMBER_OF_ENTIES
+
+# поле API -> поле values()
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+GROUP_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'posts_count': 'posts_count',
+}
+PROFILE_FIELDS = {
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts_count': 'stats__posts_count',
+    'followers_count': 'stats__followers_count',
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def api_view(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return JsonResponse(view(request, *args, **kwargs))
+        except BadRequest as error:
+            status = HTTPStatus.BAD_REQUEST
+            message = str(error)
+        except Http404:
+            status = HTTPStatus.NOT_FOUND
+            message = 'Не найдено'
+        return JsonResponse({'detail': message}, status=status)
+    return wrapper
+
+
+def requested_fields(request, fields, required=()):
+    """API names to return and the ``values()`` lookups to select."""
+    names = [
+        name for name in request.GET.get('fields', '').split(',') if name
+    ] or list(fields)
+    unknown = set(names) - set(fields)
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    lookups = {fields[name] for name in names} | set(required)
+    return names, list(lookups)
+
+
+def serialize(row, names, fields):
+    return {name: row[fields[name]] for name in names}
+
+
+def object_or_404(queryset, **filters):
+    row = queryset.filter(**filters).first()
+    if row is None:
+        raise Http404
+    return row
+
+
+def page_link(request, **cursor):
+    """URL of the request with its cursor replaced by ``cursor``."""
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(cursor)
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def post_page(request, queryset):
+    names, lookups = requested_fields(
+        request, POST_FIELDS, required=('id', 'pub_date')
+    )
+    paginator = CursorPaginator(queryset.values(*lookups), NUMBER_OF_ENTIES)
+    try:
+        page = paginator.cursor_page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        )
+    except InvalidCursor as error:
+        raise BadRequest(str(error))
+    after = page.next_cursor()
+    before = page.previous_cursor()
+    return {
+        'results': [serialize(row, names, POST_FIELDS) for row in page],
+        'next': page_link(request, after=after) if after else None,
+        'previous': page_link(request, before=before) if before else None,
+    }
+
+
+@api_view
+def post_list(request):
+    return post_page(request, Post.objects.all())
+
+
+@api_view
+def post_detail(request, post_id):
+    names, lookups = requested_fields(request, POST_FIELDS)
+    row = object_or_404(Post.objects.values(*lookups), pk=post_id)
+    return serialize(row, names, POST_FIELDS)
+
+
+@api_view
+def group_list(request):
+    names, lookups = requested_fields(request, GROUP_FIELDS, ('id',))
+    groups = Group.objects.order_by('pk').values(*lookups)
+    after = request.GET.get('after', '')
+    if after:
+        if not after.isdigit():
+            raise BadRequest('Некорректный курсор')
+        groups = groups.filter(pk__gt=after)
+    rows = list(groups[:NUMBER_OF_ENTIES + 1])
+    next_link = None
+    if len(rows) > NUMBER_OF_ENTIES:
+        rows = rows[:NUMBER_OF_ENTIES]
+        next_link = page_link(request, after=rows[-1]['id'])
+    return {
+        'results': [serialize(row, names, GROUP_FIELDS) for row in rows],
+        'next': next_link,
+    }
+
+
+@api_view
+def group_detail(request, slug):
+    names, lookups = requested_fields(request, GROUP_FIELDS)
+    row = object_or_404(Group.objects.values(*lookups), slug=slug)
+    return serialize(row, names, GROUP_FIELDS)
+
+
+@api_view
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return post_page(request, Post.objects.filter(group=group))
+
+
+@api_view
+def profile_detail(request, username):
+    names, lookups = requested_fields(request, PROFILE_FIELDS)
+    row = object_or_404(User.objects.values(*lookups), username=username)
+    for lookup in ('stats__posts_count', 'stats__followers_count'):
+        # у автора без постов и подписчиков ещё нет строки AuthorStats
+        if lookup in row and row[lookup] is None:
+            row[lookup] = 0
+    return serialize(row, names, PROFILE_FIELDS)
+
+
+@api_view
+def profile_posts(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return post_page(request, Post.objects.filter(author=author))
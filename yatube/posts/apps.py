@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core.metrics import register_collector
+
+        from . import signals  # noqa: F401
+        from .cache import cache_metrics
+        from .search import ensure_search_index_after_migrate
+
+        post_migrate.connect(ensure_search_index_after_migrate, sender=self)
+        register_collector(cache_metrics)
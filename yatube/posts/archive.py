@@ -0,0 +1,57 @@
+"""Moving old posts from ``posts_post`` to ``posts_archivedpost``.
+
+Every chunk is copied and deleted in one transaction, so an interrupted
+run leaves no post in both tables or in neither, and the next run simply
+goes on with the posts that are still old enough.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import chunk_deltas, delete_chunk, pk_chunks
+from .cache import PAGES_TAG, invalidate_pages
+from .counters import change_archived
+from .models import ArchivedPost, Post
+
+ARCHIVED_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id', 'image', 'version'
+)
+
+
+def archive_before(days=None):
+    """Posts published before this moment are moved to the archive."""
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_chunk(pks):
+    """Move posts by primary keys to the archive; number moved."""
+    posts = Post.objects.filter(pk__in=pks)
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            (ArchivedPost(**row) for row in posts.values(*ARCHIVED_FIELDS)),
+            ignore_conflicts=True,
+        )
+        authors, _ = chunk_deltas(posts, 1)
+        moved = delete_chunk(pks)
+        change_archived(authors)
+    invalidate_pages(PAGES_TAG)
+    return moved
+
+
+def archive_posts(before, size=None, limit=None):
+    """Archive posts older than ``before``, yielding the running total.
+
+    ``limit`` caps the number of posts moved by this run.
+    """
+    moved = 0
+    for chunk in pk_chunks(Post.objects.filter(pub_date__lt=before), size):
+        if limit is not None:
+            chunk = chunk[:limit - moved]
+        moved += archive_chunk(chunk)
+        yield moved
+        if limit is not None and moved >= limit:
+            return
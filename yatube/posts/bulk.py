@@ -0,0 +1,106 @@
+"""Set-based changes of many posts for the admin actions.
+
+Posts are handled in chunks of ``POSTS_BULK_CHUNK_SIZE`` primary keys:
+each chunk is one ``UPDATE`` or ``DELETE`` in its own transaction, with
+the counters corrected by the aggregated deltas of the chunk and the
+follow timelines updated by a task per chunk. Per-post ``save()`` is
+skipped and per-post delete handlers step aside inside ``in_bulk()``, so
+the page cache is invalidated once at the end.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+
+from .cache import PAGES_TAG, invalidate_pages
+from .counters import change_counters
+from .models import Post
+from .timeline import move_deliveries
+
+_in_bulk = ContextVar('in_bulk', default=False)
+
+
+@contextmanager
+def in_bulk():
+    """Counters and caches are updated by the caller for the whole chunk."""
+    token = _in_bulk.set(True)
+    try:
+        yield
+    finally:
+        _in_bulk.reset(token)
+
+
+def is_bulk():
+    return _in_bulk.get()
+
+
+def pk_chunks(queryset, size=None):
+    """Lists of primary keys of ``queryset``, in key order."""
+    size = size or settings.POSTS_BULK_CHUNK_SIZE
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        chunk = list(pks.filter(pk__gt=last)[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def chunk_deltas(posts, sign):
+    authors = Counter()
+    groups = Counter()
+    rows = posts.order_by().values('author_id', 'group_id').annotate(
+        posts=Count('pk')
+    )
+    for row in rows:
+        authors[row['author_id']] += sign * row['posts']
+        groups[row['group_id']] += sign * row['posts']
+    return authors, groups
+
+
+def move_to_group(queryset, group, size=None):
+    """Move posts to ``group`` (``None`` to ungroup); number moved."""
+    moved = 0
+    group_id = group.pk if group else None
+    for chunk in pk_chunks(queryset.exclude(group_id=group_id), size):
+        posts = Post.objects.filter(pk__in=chunk)
+        with transaction.atomic():
+            _, groups = chunk_deltas(posts, -1)
+            groups[group_id] += len(chunk)
+            old_groups = {}
+            for pk, old_group_id in posts.values_list('pk', 'group_id'):
+                old_groups.setdefault(old_group_id, []).append(pk)
+            # новая версия сбрасывает закэшированный HTML постов
+            moved += posts.update(group=group, version=F('version') + 1)
+            change_counters({}, groups)
+            for old_group_id, pks in old_groups.items():
+                move_deliveries.delay(pks, old_group_id)
+    if moved:
+        invalidate_pages(PAGES_TAG)
+    return moved
+
+
+def delete_chunk(pks):
+    """Delete posts by primary keys in one ``DELETE``; number deleted."""
+    posts = Post.objects.filter(pk__in=pks)
+    with transaction.atomic():
+        authors, groups = chunk_deltas(posts, -1)
+        # связанные строки удаляет сборщик Django, по запросу на модель
+        with in_bulk():
+            _, deleted = posts.delete()
+        change_counters(authors, groups)
+    return deleted.get(Post._meta.label, 0)
+
+
+def delete_posts(queryset, size=None):
+    """Delete posts of ``queryset``; number deleted."""
+    deleted = 0
+    for chunk in pk_chunks(queryset, size):
+        deleted += delete_chunk(chunk)
+    if deleted:
+        invalidate_pages(PAGES_TAG)
+    return deleted
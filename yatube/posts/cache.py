@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters of a cache layer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+fragment_stats = CacheStats()
+
+
+def fragment_cache():
+    return caches[settings.POSTS_FRAGMENT_CACHE]
+
+
+def fragment_key(variant, post):
+    return f'post-fragment:{variant}:{post.pk}:{post.version}'
+
+
+page_stats = CacheStats()
+
+PAGES_TAG = 'pages'
+
+
+def page_cache():
+    return caches[settings.POSTS_PAGE_CACHE]
+
+
+def _tag_key(tag):
+    return f'page-tag:{tag}'
+
+
+def tag_tokens(tags):
+    """Current token of every tag; a new token invalidates its pages."""
+    cache = page_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            tokens[key] = uuid.uuid4().hex
+            cache.set(key, tokens[key], None)
+    return [tokens[key] for key in keys]
+
+
+def invalidate_pages(*tags):
+    page_cache().set_many(
+        {_tag_key(tag): uuid.uuid4().hex for tag in tags}, None
+    )
+
+
+def is_first_page(request):
+    return not any(
+        request.GET.get(name) for name in ('after', 'before')
+    ) and request.GET.get('page', '1') == '1'
+
+
+def index_tags(request):
+    return ['index:first' if is_first_page(request) else 'index']
+
+
+def group_tags(request, slug):
+    return [f'group:{slug}']
+
+
+def profile_tags(request, username):
+    return [f'author:{username}']
+
+
+def post_tags(post, created=False):
+    """Tags of the pages a new or changed post shows up on."""
+    tags = ['index:first']
+    if not created:
+        tags.append('index')
+    tags.append(f'author:{post.author.username}')
+    if post.group_id is not None:
+        tags.append(f'group:{post.group.slug}')
+    return tags
+
+
+def cache_anonymous_page(get_tags):
+    """Cache the whole response for anonymous users.
+
+    Pages are keyed by URL and by the tokens of their ``get_tags`` tags,
+    and are answered with ETag/Last-Modified so clients get 304s.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.POSTS_PAGE_CACHE_TIMEOUT
+            if (
+                not timeout
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            tags = [PAGES_TAG] + get_tags(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f'page:{path}:' + ':'.join(tag_tokens(tags))
+            cache = page_cache()
+            cached = cache.get(key)
+            if cached is None:
+                page_stats.miss()
+                response = view(request, *args, **kwargs)
+                if response.status_code != HTTPStatus.OK:
+                    return response
+                etag = quote_etag(
+                    hashlib.md5(response.content).hexdigest()
+                )
+                cached = (
+                    response.content, response['Content-Type'],
+                    etag, int(time.time())
+                )
+                cache.set(key, cached, timeout)
+            else:
+                page_stats.hit()
+            content, content_type, etag, last_modified = cached
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = HttpResponse(content, content_type=content_type)
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, max_age=0)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_metrics():
+    samples = [
+        ({'cache': name, 'result': result}, value)
+        for name, stats in (('fragment', fragment_stats), ('page', page_stats))
+        for result, value in stats.as_dict().items()
+    ]
+    yield 'yatube_cache_requests_total', 'counter', 'Обращения к кэшу', samples
@@ -0,0 +1,100 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import AuthorStats, Group, User
+
+
+def change_counters(authors, groups):
+    """Apply ``{id: delta}`` changes to the author and group counters."""
+    with transaction.atomic():
+        for author_id, delta in authors.items():
+            if not delta:
+                continue
+            if delta > 0:
+                AuthorStats.objects.get_or_create(author_id=author_id)
+            AuthorStats.objects.filter(author_id=author_id).update(
+                posts_count=F('posts_count') + delta
+            )
+        for group_id, delta in groups.items():
+            if group_id is None or not delta:
+                continue
+            Group.objects.filter(pk=group_id).update(
+                posts_count=F('posts_count') + delta
+            )
+
+
+def change_followers(author_id, delta):
+    with transaction.atomic():
+        if delta > 0:
+            AuthorStats.objects.get_or_create(author_id=author_id)
+        AuthorStats.objects.filter(author_id=author_id).update(
+            followers_count=F('followers_count') + delta
+        )
+
+
+def change_archived(authors):
+    """Apply ``{id: delta}`` changes to the archived posts counters."""
+    with transaction.atomic():
+        for author_id, delta in authors.items():
+            if not delta:
+                continue
+            if delta > 0:
+                AuthorStats.objects.get_or_create(author_id=author_id)
+            AuthorStats.objects.filter(author_id=author_id).update(
+                archived_count=F('archived_count') + delta
+            )
+
+
+def count_posts(posts, delta):
+    authors = Counter()
+    groups = Counter()
+    for post in posts:
+        authors[post.author_id] += delta
+        groups[post.group_id] += delta
+    change_counters(authors, groups)
+
+
+def author_posts_count(author):
+    counts = AuthorStats.objects.filter(author=author).values_list(
+        'posts_count', flat=True
+    )
+    return next(iter(counts), 0)
+
+
+def author_counts(author):
+    """Numbers of the author's posts and archived posts in one query."""
+    counts = AuthorStats.objects.filter(author=author).values_list(
+        'posts_count', 'archived_count'
+    )
+    return next(iter(counts), (0, 0))
+
+
+def recount(fix=True):
+    """Compare the counters with real COUNT(*) and return the mismatches."""
+    mismatches = []
+    for kind, field, relation in (
+        ('author', 'posts_count', 'posts'),
+        ('followers', 'followers_count', 'following'),
+        ('archived', 'archived_count', 'archived_posts'),
+    ):
+        authors = User.objects.annotate(real=Count(relation)).values_list(
+            'pk', 'real', f'stats__{field}'
+        )
+        for pk, real, stored in authors.iterator():
+            if real != (stored or 0):
+                mismatches.append((kind, pk, stored or 0, real))
+                if fix:
+                    AuthorStats.objects.update_or_create(
+                        author_id=pk, defaults={field: real}
+                    )
+    groups = Group.objects.annotate(real=Count('posts')).values_list(
+        'pk', 'real', 'posts_count'
+    )
+    for pk, real, stored in groups.iterator():
+        if real != stored:
+            mismatches.append(('group', pk, stored, real))
+            if fix:
+                Group.objects.filter(pk=pk).update(posts_count=real)
+    return mismatches
@@ -0,0 +1,171 @@
+import hashlib
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+
+from .models import Group, Post, User
+
+FEED_ENTRIES = 20
+CONTENT_TYPES = {
+    'atom': 'application/atom+xml; charset=utf-8',
+    'rss': 'application/rss+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+
+
+class FeedInfo:
+    def __init__(self, request, title, link):
+        self.title = title
+        self.link = request.build_absolute_uri(link)
+        self.self_link = request.build_absolute_uri()
+        self.absolute = request.build_absolute_uri
+
+
+def entry_title(post):
+    return Truncator(post.text).chars(50)
+
+
+def entry_link(feed, post):
+    return feed.absolute(
+        reverse('posts:post_detail', kwargs={'post_id': post.pk})
+    )
+
+
+def atom(feed, posts, updated):
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f'<title>{escape(feed.title)}</title>'
+        f'<link href={quoteattr(feed.link)} rel="alternate"/>'
+        f'<link href={quoteattr(feed.self_link)} rel="self"/>'
+        f'<id>{escape(feed.link)}</id>'
+        f'<updated>{rfc3339_date(updated)}</updated>'
+    )
+    for post in posts:
+        link = entry_link(feed, post)
+        yield (
+            f'<entry><title>{escape(entry_title(post))}</title>'
+            f'<link href={quoteattr(link)} rel="alternate"/>'
+            f'<id>{escape(link)}</id>'
+            f'<published>{rfc3339_date(post.pub_date)}</published>'
+            f'<updated>{rfc3339_date(post.pub_date)}</updated>'
+            f'<author><name>{escape(post.author.username)}</name></author>'
+            f'<content type="text">{escape(post.text)}</content></entry>'
+        )
+    yield '</feed>\n'
+
+
+def rss(feed, posts, updated):
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0"><channel>'
+        f'<title>{escape(feed.title)}</title>'
+        f'<link>{escape(feed.link)}</link>'
+        f'<description>{escape(feed.title)}</description>'
+        f'<lastBuildDate>{rfc2822_date(updated)}</lastBuildDate>'
+    )
+    for post in posts:
+        link = entry_link(feed, post)
+        yield (
+            f'<item><title>{escape(entry_title(post))}</title>'
+            f'<link>{escape(link)}</link>'
+            f'<guid>{escape(link)}</guid>'
+            f'<pubDate>{rfc2822_date(post.pub_date)}</pubDate>'
+            f'<description>{escape(post.text)}</description></item>'
+        )
+    yield '</channel></rss>\n'
+
+
+def json_feed(feed, posts, updated):
+    head = json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': feed.title,
+        'home_page_url': feed.link,
+        'feed_url': feed.self_link,
+    }, ensure_ascii=False)
+    yield head[:-1] + ', "items": ['
+    for number, post in enumerate(posts):
+        link = entry_link(feed, post)
+        item = json.dumps({
+            'id': link,
+            'url': link,
+            'title': entry_title(post),
+            'content_text': post.text,
+            'date_published': post.pub_date.isoformat(),
+            'authors': [{'name': post.author.username}],
+        }, ensure_ascii=False)
+        yield item if number == 0 else ', ' + item
+    yield ']}\n'
+
+
+WRITERS = {'atom': atom, 'rss': rss, 'json': json_feed}
+
+
+def feed_response(request, fmt, queryset, describe):
+    """Stream a feed of the newest posts of ``queryset``.
+
+    Validators come from one indexed query over the newest entries: ids
+    and versions change on new, edited and deleted posts, so clients
+    that already have the feed get a 304 without it being built. There
+    is no Last-Modified: the newest ``pub_date`` stays the same when
+    posts are edited or deleted.
+    ``describe()`` returns the title and page URL of the feed or raises
+    Http404; it is only called when the feed is built or empty.
+    """
+    if fmt not in WRITERS:
+        raise Http404('Неизвестный формат ленты')
+    queryset = queryset.order_by('-pub_date', '-pk')[:FEED_ENTRIES]
+    state = list(queryset.values_list('pk', 'version', 'pub_date'))
+    if not state:
+        describe()
+    digest = hashlib.md5(
+        f'{request.path}:{[row[:2] for row in state]}'.encode()
+    ).hexdigest()
+    etag = quote_etag(digest)
+    updated = max((row[2] for row in state), default=timezone.now())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        title, link = describe()
+        feed = FeedInfo(request, title, link)
+        posts = queryset.select_related('author').iterator()
+        response = StreamingHttpResponse(
+            WRITERS[fmt](feed, posts, updated),
+            content_type=CONTENT_TYPES[fmt],
+        )
+    response['ETag'] = etag
+    return response
+
+
+def index_feed(request, fmt):
+    return feed_response(request, fmt, Post.objects.all(), lambda: (
+        'Последние обновления на сайте', reverse('posts:index')
+    ))
+
+
+def group_feed(request, slug, fmt):
+    def describe():
+        group = get_object_or_404(Group, slug=slug)
+        return group.title, reverse('posts:group_list', kwargs={'slug': slug})
+    return feed_response(
+        request, fmt, Post.objects.filter(group__slug=slug), describe
+    )
+
+
+def profile_feed(request, username, fmt):
+    def describe():
+        author = get_object_or_404(User, username=username)
+        return (
+            f'Посты пользователя {author.get_full_name() or username}',
+            reverse('posts:profile', kwargs={'username': username}),
+        )
+    return feed_response(
+        request, fmt, Post.objects.filter(author__username=username), describe
+    )
@@ -1,8 +1,14 @@
 from django import forms
-from .models import Post
+from .models import Post, PostDraft
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
+        fields = ('text', 'group', 'image')
+
+
+class DraftForm(forms.ModelForm):
+    class Meta:
+        model = PostDraft
         fields = ('text', 'group')
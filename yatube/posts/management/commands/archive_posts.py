@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_before, archive_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые посты в архив пачками; прерванный запуск '
+        'можно повторить, он продолжит с оставшихся постов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, metavar='DAYS',
+            help='Возраст постов в днях, по умолчанию '
+                 'POSTS_ARCHIVE_AFTER_DAYS',
+        )
+        parser.add_argument('--batch-size', type=int,
+                            help='Постов в одной транзакции')
+        parser.add_argument('--limit', type=int,
+                            help='Перенести не больше стольких постов')
+
+    def handle(self, *args, **options):
+        before = archive_before(options['older_than'])
+        started = time.perf_counter()
+        moved = 0
+        for moved in archive_posts(
+            before, options['batch_size'], options['limit']
+        ):
+            self.stdout.write(f'Перенесено: {moved}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'В архив перенесено постов: {moved} за {elapsed:.2f} с '
+            f'(опубликованы раньше {before:%Y-%m-%d})'
+        ))
@@ -0,0 +1,207 @@
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+from faker import Faker
+from mixer.backend.django import Mixer
+
+from posts.models import Group, Post, User
+from posts.paginators import encode_cursor
+from posts.utils import NUMBER_OF_ENTIES
+
+SCENARIOS = (
+    'index', 'group_posts', 'profile', 'post_detail', 'post_create',
+    'deep_page', 'deep_cursor',
+)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность и задержки (p50/p99) страниц '
+        'posts на отдельной тестовой базе и сохраняет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Запросов на сценарий')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--scenario', action='append',
+                            choices=SCENARIOS,
+                            help='Запустить только эти сценарии')
+        parser.add_argument('--output', help='Куда сохранить JSON')
+        parser.add_argument('--compare', help='JSON прошлого запуска')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Допустимый рост p50/p99, доля')
+
+    # замеряется сама запись, а не ограничитель частоты
+    @override_settings(RATELIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        Faker.seed(options['seed'])
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.seed(options)
+            results = {
+                name: self.run_scenario(name, options)
+                for name in options['scenario'] or SCENARIOS
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                **{
+                    name: options[name]
+                    for name in ('users', 'groups', 'posts', 'requests')
+                },
+            },
+            'results': results,
+        }
+        self.print_report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(results, options['compare'], options['threshold'])
+
+    def seed(self, options):
+        fake = Faker('ru_RU')
+        mixer = Mixer(commit=True)
+        self.users = mixer.cycle(options['users']).blend(
+            User, username=mixer.sequence('bench_user_{0}')
+        )
+        self.groups = mixer.cycle(options['groups']).blend(
+            Group, slug=mixer.sequence('bench-group-{0}')
+        )
+        batch = []
+        for _ in range(options['posts']):
+            batch.append(Post(
+                author=random.choice(self.users),
+                group=random.choice(self.groups + [None]),
+                text=fake.text(),
+            ))
+            if len(batch) == 1000:
+                Post.objects.bulk_create(batch)
+                batch = []
+        Post.objects.bulk_create(batch)
+        self.post_ids = list(Post.objects.values_list('pk', flat=True))
+        tail = Post.objects.order_by('-pub_date', '-id')[
+            len(self.post_ids) * 9 // 10:
+        ]
+        self.deep_cursors = [encode_cursor(post) for post in tail]
+        self.client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.users[0])
+
+    def request(self, name):
+        if name == 'index':
+            return self.client.get(reverse('posts:index'))
+        if name == 'group_posts':
+            slug = random.choice(self.groups).slug
+            return self.client.get(
+                reverse('posts:group_list', kwargs={'slug': slug})
+            )
+        if name == 'profile':
+            username = random.choice(self.users).username
+            return self.client.get(
+                reverse('posts:profile', kwargs={'username': username})
+            )
+        if name == 'post_detail':
+            post_id = random.choice(self.post_ids)
+            return self.client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post_id})
+            )
+        if name == 'post_create':
+            return self.author_client.post(
+                reverse('posts:post_create'), {'text': 'benchmark'}
+            )
+        if name == 'deep_page':
+            last_page = max(1, len(self.post_ids) // NUMBER_OF_ENTIES)
+            page = random.randint(last_page * 9 // 10, last_page)
+            return self.client.get(reverse('posts:index'), {'page': page})
+        return self.client.get(
+            reverse('posts:index'),
+            {'after': random.choice(self.deep_cursors)}
+        )
+
+    def run_scenario(self, name, options):
+        for _ in range(options['warmup']):
+            self.request(name)
+        timings = []
+        queries = 0
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.request(name)
+                timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{name}: ответ {response.status_code}'
+                )
+            queries += len(context.captured_queries)
+        total = sum(timings)
+        return {
+            'requests': len(timings),
+            'throughput': round(len(timings) / total, 2),
+            'mean_ms': round(statistics.mean(timings) * 1000, 3),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': round(queries / len(timings), 2),
+        }
+
+    def print_report(self, results):
+        self.stdout.write(
+            f'{"сценарий":<12} {"запр/с":>9} {"p50, мс":>9} '
+            f'{"p99, мс":>9} {"SQL":>6}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<12} {result["throughput"]:>9} '
+                f'{result["p50_ms"]:>9} {result["p99_ms"]:>9} '
+                f'{result["queries"]:>6}'
+            )
+
+    def compare(self, results, path, threshold):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            for metric in ('p50_ms', 'p99_ms', 'queries'):
+                old, new = baseline[name][metric], result[metric]
+                if old and (new - old) / old > threshold:
+                    regressions.append(f'{name} {metric}: {old} -> {new}')
+        if regressions:
+            raise CommandError(
+                'Регрессия производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,68 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from faker import Faker
+
+from posts.models import Post, User
+from posts.search import WORD_RE, search_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу с поиском через icontains: '
+        'первая страница и число найденных постов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def measure(self, make_queryset, words):
+        timings = []
+        for word in words:
+            started = time.perf_counter()
+            list(make_queryset(word)[:10])
+            make_queryset(word).count()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), max(timings)
+
+    def handle(self, *args, **options):
+        fake = Faker('ru_RU')
+        Faker.seed(options['seed'])
+        random.seed(options['seed'])
+        # данные для замера удаляются откатом транзакции
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_search')
+            texts = [fake.text() for _ in range(options['posts'])]
+            Post.objects.bulk_create(
+                Post(author=author, text=text) for text in texts
+            )
+            vocabulary = sorted({
+                word for text in texts[:500]
+                for word in WORD_RE.findall(text) if len(word) > 3
+            })
+            words = random.sample(
+                vocabulary, min(options['queries'], len(vocabulary))
+            )
+            # слова, которых нет в текстах: худший случай для LIKE
+            missing = [f'{word}щщ' for word in words]
+            queryset = Post.objects.feed()
+            results = {}
+            for label, sample in (('есть', words), ('нет', missing)):
+                results[f'icontains/{label}'] = self.measure(
+                    lambda word: queryset.filter(text__icontains=word),
+                    sample
+                )
+                results[f'index/{label}'] = self.measure(
+                    lambda word: search_posts(queryset, word), sample
+                )
+            transaction.set_rollback(True)
+        for name, (median, worst) in results.items():
+            self.stdout.write(
+                f'{name:>15}: медиана {median:.2f} мс, '
+                f'максимум {worst:.2f} мс'
+            )
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import RequestContext, engines
+from django.template.engine import Engine
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.utils import NUMBER_OF_ENTIES, prepare_posts
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# {% cache_post %} всегда промахивается: замеряется загрузка шаблонов, а не
+# попадания в кэш фрагментов, и настоящий кэш не засоряется постами-заглушками
+NO_FRAGMENT_CACHE = 'benchmark-no-fragments'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время загрузки и отрисовки posts/index.html '
+        'с десятью постами без кэша шаблонов и с кэширующим загрузчиком'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=500)
+        parser.add_argument('--template', default='posts/index.html')
+
+    def make_engine(self, loaders):
+        engine = engines.all()[0].engine
+        return Engine(
+            dirs=engine.dirs,
+            loaders=loaders,
+            context_processors=engine.context_processors,
+            libraries=engine.libraries,
+            debug=False,
+        )
+
+    def make_context(self):
+        author = User(pk=1, username='author', first_name='Лев',
+                      last_name='Толстой')
+        group = Group(pk=1, title='Группа', slug='group')
+        now = timezone.now()
+        posts = [
+            Post(pk=num, text=f'Текст поста номер {num}. ' * 10,
+                 author=author, group=group, pub_date=now)
+            for num in range(1, NUMBER_OF_ENTIES + 1)
+        ]
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        page_obj = prepare_posts(Paginator(posts, NUMBER_OF_ENTIES).page(1))
+        return request, {'page_obj': page_obj}
+
+    def measure(self, engine, name, renders):
+        request, context = self.make_context()
+        timings = []
+        for _ in range(renders):
+            started = time.perf_counter()
+            template = engine.get_template(name)
+            template.render(RequestContext(request, context))
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), max(timings)
+
+    def handle(self, *args, **options):
+        caches = dict(settings.CACHES, **{NO_FRAGMENT_CACHE: {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }})
+        with override_settings(
+            CACHES=caches, POSTS_FRAGMENT_CACHE=NO_FRAGMENT_CACHE
+        ):
+            self.compare(options)
+
+    def compare(self, options):
+        name = options['template']
+        renders = options['renders']
+        plain = self.measure(self.make_engine(LOADERS), name, renders)
+        cached = self.measure(
+            self.make_engine([
+                ('django.template.loaders.cached.Loader', LOADERS),
+            ]),
+            name, renders,
+        )
+        for title, (median, worst) in (
+            ('без кэша', plain), ('с кэшем', cached)
+        ):
+            self.stdout.write(
+                f'{title:<10} медиана {median:.3f} мс, худший {worst:.3f} мс'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение: {plain[0] / cached[0]:.1f}x'
+        ))
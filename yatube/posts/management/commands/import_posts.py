@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, guess_format, import_posts, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSON Lines или CSV пачками; недостающие '
+        'авторы и группы создаются. Повторная загрузка того же файла '
+        'безопасна: посты, у автора которых уже есть пост с той же '
+        'датой публикации, пропускаются'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdin')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        started = time.perf_counter()
+        if path == '-':
+            count = self.load(sys.stdin, fmt, options)
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                count = self.load(stream, fmt, options)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {count} за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-6):.0f} строк/с)'
+        ))
+
+    def load(self, stream, fmt, options):
+        started = time.perf_counter()
+        count = 0
+        for size in import_posts(
+            read_rows(stream, fmt), options['batch_size']
+        ):
+            count += size
+            if options['verbosity'] > 1:
+                rate = count / max(time.perf_counter() - started, 1e-6)
+                self.stdout.write(f'{count} ({rate:.0f} строк/с)')
+        return count
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и подписчиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не исправляя',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = recount(fix=not options['check'])
+        for kind, pk, stored, real in mismatches:
+            self.stdout.write(f'{kind} {pk}: {stored} -> {real}')
+        if options['check'] and mismatches:
+            raise CommandError(f'Расхождений: {len(mismatches)}')
+        fixed = 0 if options['check'] else len(mismatches)
+        self.stdout.write(self.style.SUCCESS(f'Исправлено: {fixed}'))
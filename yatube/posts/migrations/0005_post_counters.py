@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    authors = Post.objects.order_by().values('author').annotate(
+        total=models.Count('pk')
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=row['author'], posts_count=row['total'])
+        for row in authors
+    )
+    groups = Post.objects.exclude(group=None).order_by().values(
+        'group'
+    ).annotate(total=models.Count('pk'))
+    for row in groups:
+        Group.objects.filter(pk=row['group']).update(
+            posts_count=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0004_post_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число постов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
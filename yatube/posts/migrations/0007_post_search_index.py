@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:40
+
+from django.db import migrations
+
+from posts.search import drop_search_index, ensure_search_index
+
+
+def create_index(apps, schema_editor):
+    ensure_search_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:55
+
+from django.db import migrations
+import posts.models
+import sorl.thumbnail.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, upload_to=posts.models.post_image_path, verbose_name='Картинка'),
+        ),
+    ]
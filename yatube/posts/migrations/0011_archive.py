@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import posts.models
+import sorl.thumbnail.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0010_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='archived_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число постов в архиве'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('pub_date', models.DateTimeField(verbose_name='date published')),
+                ('image', sorl.thumbnail.fields.ImageField(blank=True, upload_to=posts.models.post_image_path, verbose_name='Картинка')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия')),
+                ('archived', models.DateTimeField(auto_now_add=True, verbose_name='Дата переноса в архив')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posts', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'ordering': ['-pub_date', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedpost',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='archived_author_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDraft',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(blank=True, verbose_name='Текст')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Сохранён')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group', verbose_name='Группа')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to='posts.Post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='postdraft',
+            constraint=models.UniqueConstraint(fields=('author', 'post'), name='unique_post_draft'),
+        ),
+        migrations.AddConstraint(
+            model_name='postdraft',
+            constraint=models.UniqueConstraint(condition=models.Q(post__isnull=True), fields=('author',), name='unique_new_post_draft'),
+        ),
+    ]
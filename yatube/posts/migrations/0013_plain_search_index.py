@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:10
+
+from django.db import migrations
+
+from posts.search import drop_search_index, ensure_search_index
+
+
+def rebuild_index(apps, schema_editor):
+    # старый индекс хранил основы слов и заполнялся функцией Python
+    drop_search_index(schema_editor.connection)
+    ensure_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_draft'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_index, rebuild_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_plain_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timelineentry',
+            name='timeline_reader_pub_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['reader', '-pub_date', '-post'], name='timeline_reader_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:39
+
+from django.db import migrations
+import posts.models
+import sorl.thumbnail.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_timeline_index_post'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedpost',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, storage=posts.models.ContentHashStorage(), upload_to=posts.models.post_image_path, verbose_name='Картинка'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, storage=posts.models.ContentHashStorage(), upload_to=posts.models.post_image_path, verbose_name='Картинка'),
+        ),
+    ]
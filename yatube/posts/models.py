@@ -1,4 +1,9 @@
-from django.db import models
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from sorl.thumbnail import ImageField
 
 from django.contrib.auth import get_user_model
 
@@ -9,10 +14,86 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Число постов', default=0, editable=False
+    )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков', default=0
+    )
+    archived_count = models.PositiveIntegerField(
+        'Число постов в архиве', default=0
+    )
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        """Posts with author and group joined for list pages."""
+        return self.select_related('author', 'group').defer(
+            'author__password',
+            'author__last_login',
+            'group__description',
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .counters import count_posts
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            count_posts(objs, 1)
+        return objs
+
+
+class EditConflict(Exception):
+    """The post was saved by someone else since it was loaded."""
+
+
+def post_image_path(instance, filename):
+    """``posts/ab/<sha1>.jpg``: the name changes with the content."""
+    digest = hashlib.sha1()
+    for chunk in instance.image.chunks():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+    extension = os.path.splitext(filename)[1].lower()
+    return f'posts/{digest[:2]}/{digest}{extension}'
+
+
+class ContentHashStorage(FileSystemStorage):
+    """Files named by ``post_image_path`` are stored once.
+
+    The same name means the same content, so an existing file is reused
+    instead of being saved again under a random suffix.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is not None and self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+image_storage = ContentHashStorage()
+
 
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -25,9 +106,231 @@ class Post(models.Model):
     group = models.ForeignKey(Group, on_delete=models.SET_NULL,
                               related_name="posts", blank=True,
                               null=True, verbose_name='Группа')
+    image = ImageField(
+        'Картинка',
+        upload_to=post_image_path,
+        storage=image_storage,
+        blank=True,
+    )
+    version = models.PositiveIntegerField(
+        'Версия', default=0, editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        # ленты сортируются по ordering; профиль и группа сначала
+        # фильтруют, поэтому автор и группа стоят в индексе первыми
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, expected_version=None, **kwargs):
+        """Save the post; ``version`` is bumped on every update.
+
+        With ``expected_version`` the row is updated only if it still has
+        that version, otherwise ``EditConflict`` is raised.
+        """
+        loaded_version = self.version
+        if not self._state.adding:
+            # новая версия сбрасывает закэшированный HTML поста
+            self.version = (
+                loaded_version if expected_version is None
+                else expected_version
+            ) + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        self._expected_version = expected_version
+        try:
+            # счётчики постов обновляются сигналами в этой же транзакции
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+        except EditConflict:
+            self.version = loaded_version
+            raise
+        finally:
+            self._expected_version = None
+
+    def _do_update(self, base_qs, *args, **kwargs):
+        expected_version = getattr(self, '_expected_version', None)
+        if expected_version is None:
+            return super()._do_update(base_qs, *args, **kwargs)
+        updated = super()._do_update(
+            base_qs.filter(version=expected_version), *args, **kwargs
+        )
+        if not updated:
+            raise EditConflict(
+                f'Пост {self.pk} уже не версии {expected_version}'
+            )
+        return updated
+
+
+class ArchivedPost(models.Model):
+    """An old post moved out of ``posts_post`` by ``posts.archive``.
+
+    It keeps the id, so links to the post stay valid.
+    """
+
+    is_archived = True
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField('date published')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(Group, on_delete=models.SET_NULL,
+                              related_name='archived_posts', blank=True,
+                              null=True, verbose_name='Группа')
+    image = ImageField(
+        'Картинка',
+        upload_to=post_image_path,
+        storage=image_storage,
+        blank=True,
+    )
+    version = models.PositiveIntegerField('Версия', default=0)
+    archived = models.DateTimeField('Дата переноса в архив', auto_now_add=True)
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='archived_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+
+class PostDraft(models.Model):
+    """Autosaved text of a new post or of a post being edited.
+
+    Drafts live apart from ``posts_post`` until the post is published.
+    """
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='drafts'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='drafts'
+    )
+    text = models.TextField('Текст', blank=True)
+    group = models.ForeignKey(Group, on_delete=models.SET_NULL,
+                              related_name='+', blank=True,
+                              null=True, verbose_name='Группа')
+    updated = models.DateTimeField('Сохранён', auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'post'], name='unique_post_draft'
+            ),
+            # черновик нового поста у автора один
+            models.UniqueConstraint(
+                fields=['author'], condition=models.Q(post__isnull=True),
+                name='unique_new_post_draft'
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class GroupFollow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_follower',
+        verbose_name='Подписчик'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Группа'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'group'], name='unique_group_follow'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.group_id}'
+
+
+class TimelineEntry(models.Model):
+    """A post delivered to a reader's follow feed at publication time."""
+    reader = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    # копия Post.pub_date, чтобы обрезать ленту по индексу
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reader', 'post'], name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['reader', '-pub_date', '-post'],
+                         name='timeline_reader_pub_date_idx'),
+        ]
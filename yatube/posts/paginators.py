@@ -0,0 +1,247 @@
+import base64
+import binascii
+
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def cursor_key(post):
+    """``(pub_date, id)`` of a post instance or of a ``values()`` row."""
+    if isinstance(post, dict):
+        return post['pub_date'], post['id']
+    return post.pub_date, post.pk
+
+
+def encode_cursor(post):
+    """Cursor of a post instance or of a ``values()`` row."""
+    pub_date, pk = cursor_key(post)
+    raw = f'{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.rsplit('|', 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor('Некорректный курсор')
+    if pub_date is None:
+        raise InvalidCursor('Некорректный курсор')
+    return pub_date, pk
+
+
+class CountedPage(Page):
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class CountedPaginator(Paginator):
+    """Paginator that trusts a precomputed number of objects.
+
+    Its pages link only to the first, the last and the nearest pages,
+    see ``get_elided_page_range()``.
+    """
+
+    ELLIPSIS = '…'
+    ON_EACH_SIDE = 3
+    ON_ENDS = 1
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    def _get_page(self, *args, **kwargs):
+        return CountedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, on_each_side=None,
+                              on_ends=None):
+        """Page numbers around ``number`` with ``ELLIPSIS`` in the gaps.
+
+        ``1 … 47 48 49 50 51 52 53 … 10000`` instead of all 10000 pages.
+        """
+        if on_each_side is None:
+            on_each_side = self.ON_EACH_SIDE
+        if on_ends is None:
+            on_ends = self.ON_ENDS
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+
+class CursorPage(Page):
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} items>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self.object_list[-1])
+
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self.object_list[0])
+
+
+def keyset(queryset, cursor=None, forward=True,
+           fields=('pub_date', 'pk'), **filters):
+    """``queryset`` cut at ``cursor`` and ordered by ``(pub_date, id)``.
+
+    Newest first when ``forward``, oldest first otherwise. ``fields`` name
+    the date and id to order by; ``filters`` go into the same ``filter()``
+    call as the cursor, so both use one join of a related table.
+    """
+    date_field, pk_field = fields
+    lookup = 'lt' if forward else 'gt'
+    conditions = [Q(**filters)]
+    if cursor is not None:
+        pub_date, pk = cursor
+        conditions.append(
+            Q(**{f'{date_field}__{lookup}': pub_date})
+            | Q(**{date_field: pub_date, f'{pk_field}__{lookup}': pk})
+        )
+    prefix = '-' if forward else ''
+    return queryset.filter(*conditions).order_by(
+        f'{prefix}{date_field}', f'{prefix}{pk_field}'
+    )
+
+
+class CursorPaginator(Paginator):
+    """Keyset pagination over ``(pub_date, id)`` without COUNT and OFFSET.
+
+    ``object_list`` must be a queryset; it is reordered newest first.
+    """
+
+    def sources(self):
+        """Functions of ``(cursor, forward, limit)`` reading the rows."""
+        return [lambda cursor, forward, limit: keyset(
+            self.object_list, cursor, forward
+        )[:limit]]
+
+    def cursor_page(self, after=None, before=None):
+        token = before or after
+        cursor = decode_cursor(token) if token else None
+        forward = not before
+        rows = {}
+        for source in self.sources():
+            for row in source(cursor, forward, self.per_page + 1):
+                rows[cursor_key(row)] = row
+        rows = [rows[key] for key in sorted(rows, reverse=forward)]
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return CursorPage(rows, self, has_more, bool(after and rows))
+        if not rows:
+            return self.cursor_page()
+        return CursorPage(rows[::-1], self, True, has_more)
+
+    def get_cursor_page(self, after=None, before=None):
+        """Return a valid page even if the cursor is broken."""
+        try:
+            return self.cursor_page(after=after, before=before)
+        except InvalidCursor:
+            return self.cursor_page()
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """Keyset pagination over posts merged from several queries.
+
+    ``object_list`` is a list of functions of ``(cursor, forward, limit)``
+    returning up to ``limit`` posts, read with ``keyset()``. Each query
+    has its own ``LIMIT``, so it can walk its own index; the pages are
+    merged in memory.
+    """
+
+    def sources(self):
+        return self.object_list
+
+
+def estimate_rows(model, using):
+    """Number of rows in the model's table from planner statistics.
+
+    ``None`` if the database has no statistics for it yet
+    (SQLite fills ``sqlite_stat1`` on ``ANALYZE``).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [table],
+            )
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table],
+            )
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for the admin that does not ``COUNT(*)`` a whole table.
+
+    An unfiltered queryset over more than ``ESTIMATE_FROM`` rows is
+    counted from database statistics; filtered ones are counted exactly.
+    """
+
+    ESTIMATE_FROM = 100000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_rows(
+                self.object_list.model, self.object_list.db
+            )
+            if estimate is not None and estimate > self.ESTIMATE_FROM:
+                return estimate
+        return super().count
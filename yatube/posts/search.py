@@ -0,0 +1,236 @@
+import re
+
+from django.db import connections
+
+FTS_TABLE = 'posts_post_fts'
+WORD_RE = re.compile(r'\w+')
+
+# Snowball-стеммер русского языка:
+# http://snowball.tartarus.org/algorithms/russian/stemmer.html
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = (
+    ('вшись', 'вши', 'в'),
+    ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв'),
+)
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое', 'ей',
+    'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую', 'юю', 'ая',
+    'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    ('ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'й', 'л', 'н'),
+    ('уйте', 'ейте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло',
+     'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй', 'ил', 'ыл',
+     'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю'),
+)
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие', 'ье',
+    'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию',
+    'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _regions(word):
+    """Start indexes of the RV and R2 regions of a word."""
+    rv = len(word)
+    for index, letter in enumerate(word):
+        if letter in VOWELS:
+            rv = index + 1
+            break
+    r1 = len(word)
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r1 = index + 1
+            break
+    r2 = len(word)
+    for index in range(r1 + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+def _strip(rv, endings):
+    for ending in sorted(endings, key=len, reverse=True):
+        if rv.endswith(ending):
+            return rv[:-len(ending)]
+    return None
+
+
+def _strip_grouped(rv, groups):
+    """Strip the longest ending; the first group must follow 'а' or 'я'."""
+    first, second = groups
+    for ending in sorted(first + second, key=len, reverse=True):
+        if not rv.endswith(ending):
+            continue
+        stem = rv[:-len(ending)]
+        if ending in second or stem.endswith(('а', 'я')):
+            return stem
+    return None
+
+
+def _strip_adjectival(rv):
+    stem = _strip(rv, ADJECTIVE)
+    if stem is None:
+        return None
+    participle = _strip_grouped(stem, PARTICIPLE)
+    return stem if participle is None else participle
+
+
+def _strip_inflection(rv):
+    gerund = _strip_grouped(rv, PERFECTIVE_GERUND)
+    if gerund is not None:
+        return gerund
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    for strip in (
+        _strip_adjectival,
+        lambda value: _strip_grouped(value, VERB),
+        lambda value: _strip(value, NOUN),
+    ):
+        stripped = strip(rv)
+        if stripped is not None:
+            return stripped
+    return rv
+
+
+def _strip_tail(rv):
+    if rv.endswith('нн'):
+        return rv[:-1]
+    superlative = _strip(rv, SUPERLATIVE)
+    if superlative is not None:
+        return superlative[:-1] if superlative.endswith('нн') else superlative
+    if rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], _strip_inflection(word[rv_start:])
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and (
+            rv_start + len(rv) - len(ending) >= r2_start
+        ):
+            rv = rv[:-len(ending)]
+            break
+    return prefix + _strip_tail(rv)
+
+
+def match_expression(query):
+    # индекс хранит слова целиком, а основа слова - его префикс
+    words = [stem(word) for word in WORD_RE.findall(query)]
+    return ' AND '.join(f'"{word}"*' for word in words if word)
+
+
+def search_posts(queryset, query):
+    """Filter posts by words of ``query`` using the database index."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        expression = match_expression(query)
+        if not expression:
+            return queryset.none()
+        return queryset.extra(
+            where=[
+                f'posts_post.id IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[expression],
+        )
+    if vendor == 'postgresql':
+        return queryset.extra(
+            where=[
+                "to_tsvector('russian', posts_post.text) "
+                "@@ plainto_tsquery('russian', %s)"
+            ],
+            params=[query],
+        )
+    for word in WORD_RE.findall(query):
+        queryset = queryset.filter(text__icontains=word)
+    return queryset
+
+
+def indexed_text(column):
+    """SQL for the indexed form of a text: 'ё' is folded as in ``stem``."""
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+# Триггеры - обычный SQL без функций Python, чтобы в базу можно было
+# писать и без Django: из консоли sqlite3, скриптов восстановления и т. п.
+TRIGGERS = {
+    'posts_post_fts_insert': (
+        'AFTER INSERT ON posts_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, body) '
+        f"VALUES (new.id, {indexed_text('new.text')}); END"
+    ),
+    'posts_post_fts_update': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id; '
+        f'INSERT INTO {FTS_TABLE}(rowid, body) '
+        f"VALUES (new.id, {indexed_text('new.text')}); END"
+    ),
+    'posts_post_fts_delete': (
+        'AFTER DELETE ON posts_post BEGIN '
+        f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END'
+    ),
+}
+
+
+def ensure_search_index(connection):
+    """Create the full-text index and its triggers.
+
+    SQLite drops triggers when a migration remakes ``posts_post``, so this
+    also runs after every ``migrate``. The remade table keeps its rows, so
+    the index is filled only when it is created.
+    """
+    with connection.cursor() as cursor:
+        if 'posts_post' not in connection.introspection.table_names(cursor):
+            return
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS posts_post_text_fts_idx '
+                "ON posts_post USING gin (to_tsvector('russian', text))"
+            )
+            return
+        if connection.vendor != 'sqlite':
+            return
+        created = FTS_TABLE not in connection.introspection.table_names(
+            cursor
+        )
+        if created:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(body)'
+            )
+        for name, body in TRIGGERS.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+        if created:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, body) '
+                f"SELECT id, {indexed_text('text')} FROM posts_post"
+            )
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS posts_post_text_fts_idx')
+        elif connection.vendor == 'sqlite':
+            for name in TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def ensure_search_index_after_migrate(sender, using, **kwargs):
+    ensure_search_index(connections[using])
@@ -0,0 +1,150 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .bulk import is_bulk
+from .cache import PAGES_TAG, invalidate_pages, post_tags
+from .counters import change_counters, change_followers, count_posts
+from .models import Follow, Group, GroupFollow, Post, User
+from .thumbnails import make_thumbnails
+from .timeline import (
+    backfill_author, backfill_group, fan_out, move_deliveries, prune_author,
+    prune_group
+)
+
+GROUP_FRAGMENT_FIELDS = ('title', 'slug')
+AUTHOR_FRAGMENT_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if created:
+        count_posts([instance], 1)
+        fan_out.delay(instance.pk)
+    else:
+        authors = {}
+        groups = {}
+        for attname, changes in (
+            ('author_id', authors), ('group_id', groups)
+        ):
+            old = loaded.get(attname, getattr(instance, attname))
+            new = getattr(instance, attname)
+            if old != new:
+                changes[old] = -1
+                changes[new] = 1
+        change_counters(authors, groups)
+        if groups:
+            move_deliveries.delay(
+                [instance.pk], loaded.get('group_id', instance.group_id)
+            )
+    tags = post_tags(instance, created)
+    old_group_id = loaded.get('group_id')
+    if old_group_id not in (None, instance.group_id):
+        tags.extend(
+            f'group:{slug}' for slug in
+            Group.objects.filter(pk=old_group_id).values_list(
+                'slug', flat=True
+            )
+        )
+    invalidate_pages(*tags)
+    if instance.image and (
+        created or loaded.get('image') != instance.image.name
+    ):
+        make_thumbnails.delay(instance.pk)
+    instance._loaded_values = dict(
+        loaded, author_id=instance.author_id, group_id=instance.group_id,
+        image=instance.image.name,
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if is_bulk():
+        return
+    count_posts([instance], -1)
+    invalidate_pages(*post_tags(instance))
+
+
+def bump_post_versions(**filters):
+    Post.objects.filter(**filters).update(version=F('version') + 1)
+
+
+@receiver(post_save, sender=Group)
+def bump_versions_on_group_rename(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None)
+    if created or loaded is None:
+        invalidate_pages(f'group:{instance.slug}')
+        return
+    if any(
+        loaded.get(name) != getattr(instance, name)
+        for name in GROUP_FRAGMENT_FIELDS
+    ):
+        bump_post_versions(group=instance)
+        invalidate_pages(PAGES_TAG)
+    else:
+        invalidate_pages(f'group:{instance.slug}')
+    loaded.update(
+        (name, getattr(instance, name)) for name in GROUP_FRAGMENT_FIELDS
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def bump_versions_on_group_delete(sender, instance, **kwargs):
+    # после удаления у постов group_id станет NULL без новой версии
+    bump_post_versions(group=instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_pages(PAGES_TAG)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_name(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None
+        and not set(update_fields) & set(AUTHOR_FRAGMENT_FIELDS)
+    ):
+        return
+    instance._stored_name = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_FRAGMENT_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def bump_versions_on_author_rename(sender, instance, created, **kwargs):
+    if created:
+        invalidate_pages(f'author:{instance.username}')
+        return
+    stored = instance.__dict__.pop('_stored_name', None)
+    current = tuple(getattr(instance, name) for name in AUTHOR_FRAGMENT_FIELDS)
+    if stored is not None and stored != current:
+        bump_post_versions(author=instance)
+        invalidate_pages(PAGES_TAG)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        change_followers(instance.author_id, 1)
+        backfill_author.delay(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_followers(instance.author_id, -1)
+    prune_author.delay(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=GroupFollow)
+def group_follow_created(sender, instance, created, **kwargs):
+    if created:
+        backfill_group.delay(instance.user_id, instance.group_id)
+
+
+@receiver(post_delete, sender=GroupFollow)
+def group_follow_deleted(sender, instance, **kwargs):
+    prune_group.delay(instance.user_id, instance.group_id)
@@ -0,0 +1,45 @@
+from django import template
+
+from ..cache import fragment_cache, fragment_key, fragment_stats
+
+register = template.Library()
+
+
+class PostFragmentNode(template.Node):
+    def __init__(self, nodelist, post, variant):
+        self.nodelist = nodelist
+        self.post = post
+        self.variant = variant
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        key = fragment_key(self.variant.resolve(context), post)
+        cache = fragment_cache()
+        html = cache.get(key)
+        if html is not None:
+            fragment_stats.hit()
+            return html
+        fragment_stats.miss()
+        html = self.nodelist.render(context)
+        cache.set(key, html)
+        return html
+
+
+@register.tag
+def cache_post(parser, token):
+    """Cache the rendered HTML of a post until its version changes.
+
+    Usage: ``{% cache_post post 'index' %} ... {% endcache_post %}``
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает пост и название шаблона'
+        )
+    nodelist = parser.parse(('endcache_post',))
+    parser.delete_first_token()
+    return PostFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+    )
@@ -0,0 +1,24 @@
+import logging
+
+from django import template
+
+from ..thumbnails import thumbnail
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+@register.simple_tag
+def post_thumbnail(image, size):
+    """Thumbnail of a post image, ``None`` if there is no image.
+
+    Usage: ``{% post_thumbnail post.image 'feed' as thumb %}``
+    """
+    if not image:
+        return None
+    try:
+        return thumbnail(image, size)
+    except Exception:
+        # как и тег thumbnail из sorl: битая картинка не роняет страницу
+        logger.exception('Не удалось сделать миниатюру %s', image)
+        return None
@@ -0,0 +1,196 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .. import bulk
+from ..counters import recount
+from ..models import Group, Post, TimelineEntry, User
+from ..paginators import EstimatedCountPaginator, estimate_rows
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        start = Group.objects.count()
+        for num in range(start, start + count):
+            author = User.objects.create_user(username=f'author_{num}')
+            group = Group.objects.create(
+                title=f'group_{num}', slug=f'group_{num}'
+            )
+            Post.objects.create(author=author, group=group, text='text')
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse('admin:posts_post_changelist')
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.create_posts(2)
+        few, _ = self.changelist_queries()
+        self.create_posts(8)
+        many, response = self.changelist_queries()
+        self.assertEqual(few, many)
+        # группы в строках выбираются автодополнением, без полного списка
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, '>group_9</option>', count=1)
+
+    def test_change_group_in_list(self):
+        self.create_posts(2)
+        first, second = Post.objects.order_by('pk')
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'form-TOTAL_FORMS': 2,
+                'form-INITIAL_FORMS': 2,
+                'form-0-id': second.pk,
+                'form-0-group': second.group_id,
+                'form-1-id': first.pk,
+                'form-1-group': second.group_id,
+                '_save': 'Сохранить',
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        first.refresh_from_db()
+        self.assertEqual(first.group_id, second.group_id)
+
+    def test_date_hierarchy(self):
+        self.create_posts(1)
+        year = Post.objects.get().pub_date.year
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'),
+            {'pub_date__year': year}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.user, text='text')
+
+    @mock.patch('posts.paginators.estimate_rows', return_value=10 ** 6)
+    def test_large_table_is_estimated(self, estimate_rows):
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 10 ** 6)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=self.user), 10
+        )
+        self.assertEqual(paginator.count, 1)
+
+    @mock.patch('posts.paginators.estimate_rows', return_value=50)
+    def test_small_table_is_counted(self, estimate_rows):
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def test_sqlite_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_rows(Post, 'default'), 1)
+
+
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='author')
+        cls.old = Group.objects.create(title='old', slug='old')
+        cls.new = Group.objects.create(title='new', slug='new')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        for num in range(5):
+            Post.objects.create(
+                author=self.spammer, group=self.old, text=f'spam {num}'
+            )
+        self.post = Post.objects.create(
+            author=self.author, group=self.old, text='post'
+        )
+
+    def run_action(self, action, posts, **data):
+        data = {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+            **data,
+        }
+        return self.client.post(
+            reverse('admin:posts_post_changelist'), data, follow=True
+        )
+
+    def test_move_to_group(self):
+        posts = Post.objects.filter(author=self.spammer)
+        response = self.run_action('move_to_group', posts)
+        self.assertContains(response, 'Постов: 5')
+        response = self.run_action(
+            'move_to_group', posts, apply=1, group=self.new.pk
+        )
+        self.assertContains(response, 'Перенесено постов: 5 за')
+        self.assertEqual(self.new.posts.count(), 5)
+        self.assertEqual(recount(fix=False), [])
+
+    def test_delete_by_author(self):
+        self.run_action(
+            'delete_by_author', Post.objects.filter(text='spam 0'), apply=1
+        )
+        self.assertEqual(list(Post.objects.all()), [self.post])
+        self.assertEqual(recount(fix=False), [])
+
+    def test_delete_by_date_range(self):
+        spam = Post.objects.filter(author=self.spammer)
+        bounds = spam.aggregate(since=Min('pub_date'), until=Max('pub_date'))
+        self.run_action('delete_by_date_range', spam, apply=1, **{
+            name: value.strftime('%Y-%m-%d %H:%M:%S.%f')
+            for name, value in bounds.items()
+        })
+        self.assertEqual(list(Post.objects.all()), [self.post])
+
+    def test_chunks(self):
+        reader = User.objects.create_user(username='reader')
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(reader=reader, post=post, pub_date=post.pub_date)
+            for post in Post.objects.all()
+        )
+        spam = Post.objects.filter(author=self.spammer)
+        pks = [
+            str(pk) for pk in spam.order_by('pk').values_list('pk', flat=True)
+        ]
+        self.assertEqual(bulk.move_to_group(spam, None, size=2), 5)
+        with CaptureQueriesContext(connection) as context:
+            deleted = bulk.delete_posts(spam, size=2)
+        self.assertEqual(deleted, 5)
+        # по одному DELETE на чанк, без удаления постов по одному;
+        # сборщик Django перечисляет ключи в порядке убывания
+        self.assertEqual(
+            [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('DELETE FROM "posts_post"')
+            ],
+            [
+                'DELETE FROM "posts_post" WHERE "posts_post"."id" '
+                f'IN ({", ".join(reversed(pks[start:start + 2]))})'
+                for start in (0, 2, 4)
+            ]
+        )
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+        self.assertEqual(recount(fix=False), [])
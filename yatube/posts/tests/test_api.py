@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Group, Post, User
+from ..utils import NUMBER_OF_ENTIES
+from .utils import QueryCountMixin
+
+NUMBER_OF_POSTS = 13
+
+
+class ApiTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        for num in range(NUMBER_OF_POSTS):
+            Post.objects.create(
+                author=cls.user, text=f'test_text_{num}',
+                group=cls.group if num % 2 else None,
+            )
+        cls.ordered = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def test_post_list_is_cursor_paginated(self):
+        response = self.assertViewQueries(reverse('api_v1:post_list'), 1)
+        data = response.json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [post.pk for post in self.ordered[:NUMBER_OF_ENTIES]]
+        )
+        self.assertEqual(data['results'][0]['author'], 'test_user')
+        self.assertIsNone(data['previous'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual(
+            len(data['results']), NUMBER_OF_POSTS - NUMBER_OF_ENTIES
+        )
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('api_v1:post_list'), {'fields': 'text'}
+        )
+        self.assertEqual(
+            response.json()['results'][0], {'text': self.ordered[0].text}
+        )
+        response = self.client.get(
+            reverse('api_v1:post_list'), {'fields': 'text,password'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_details(self):
+        post = self.ordered[0]
+        urls = {
+            reverse('api_v1:post_detail', args=[post.pk]): {
+                'id': post.pk, 'text': post.text,
+            },
+            reverse('api_v1:group_detail', args=['test_slug']): {
+                'slug': 'test_slug', 'posts_count': NUMBER_OF_POSTS // 2,
+            },
+            reverse('api_v1:profile_detail', args=['test_user']): {
+                'username': 'test_user', 'posts_count': NUMBER_OF_POSTS,
+                'followers_count': 0,
+            },
+        }
+        for url, expected in urls.items():
+            with self.subTest(url=url):
+                response = self.assertViewQueries(url, 1)
+                data = response.json()
+                self.assertEqual(
+                    {key: data[key] for key in expected}, expected
+                )
+
+    def test_nested_lists(self):
+        data = self.client.get(
+            reverse('api_v1:group_posts', args=['test_slug'])
+        ).json()
+        self.assertEqual(len(data['results']), NUMBER_OF_POSTS // 2)
+        self.assertTrue(
+            all(post['group'] == 'test_slug' for post in data['results'])
+        )
+        data = self.client.get(reverse('api_v1:group_list')).json()
+        self.assertEqual(data['results'][0]['title'], 'test_group')
+        self.assertIsNone(data['next'])
+
+    def test_group_list_keeps_query(self):
+        Group.objects.bulk_create(
+            Group(title=f'group_{num}', slug=f'group_{num}')
+            for num in range(NUMBER_OF_ENTIES)
+        )
+        data = self.client.get(
+            reverse('api_v1:group_list'), {'fields': 'slug'}
+        ).json()
+        self.assertIn('fields=slug', data['next'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual(data['results'], [{'slug': 'group_9'}])
+        self.assertIsNone(data['next'])
+
+    def test_invalid_cursor(self):
+        for params in ({'after': 'битый'}, {'before': '!!'}):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    reverse('api_v1:post_list'), params
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+                self.assertEqual(
+                    response.json(), {'detail': 'Некорректный курсор'}
+                )
+
+    def test_not_found(self):
+        for url in (
+            reverse('api_v1:post_detail', args=[0]),
+            reverse('api_v1:group_posts', args=['no_group']),
+            reverse('api_v1:profile_detail', args=['nobody']),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertIn('detail', response.json())
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from ..archive import archive_before, archive_posts
+from ..counters import author_counts, recount
+from ..models import ArchivedPost, Group, Post, User
+from ..utils import NUMBER_OF_ENTIES
+
+OLD_POSTS = 13
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='old_author')
+        cls.group = Group.objects.create(title='group', slug='group')
+
+    def setUp(self):
+        for num in range(OLD_POSTS):
+            Post.objects.create(
+                author=self.author, group=self.group, text=f'old_{num}'
+            )
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=400))
+        self.fresh = Post.objects.create(author=self.author, text='fresh')
+
+    def test_archive_in_chunks(self):
+        totals = list(archive_posts(archive_before(365), size=5))
+        self.assertEqual(totals, [5, 10, OLD_POSTS])
+        self.assertEqual(list(Post.objects.all()), [self.fresh])
+        self.assertEqual(ArchivedPost.objects.count(), OLD_POSTS)
+        self.assertEqual(author_counts(self.author), (1, OLD_POSTS))
+        self.assertEqual(recount(fix=False), [])
+
+    def test_command_is_incremental(self):
+        output = StringIO()
+        call_command('archive_posts', limit=4, batch_size=3, stdout=output)
+        self.assertIn('В архив перенесено постов: 4', output.getvalue())
+        self.assertEqual(ArchivedPost.objects.count(), 4)
+        call_command('archive_posts', stdout=output)
+        self.assertEqual(ArchivedPost.objects.count(), OLD_POSTS)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_pages_read_the_archive(self):
+        old = Post.objects.filter(text='old_0').get()
+        list(archive_posts(archive_before(365)))
+        self.client.force_login(self.author)
+
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': old.pk})
+        )
+        self.assertContains(response, 'old_0')
+        self.assertNotContains(
+            response, reverse('posts:post_edit', kwargs={'post_id': old.pk})
+        )
+
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'old_author'})
+        )
+        archive_url = reverse(
+            'posts:profile_archive', kwargs={'username': 'old_author'}
+        )
+        self.assertContains(response, f'Архив: {OLD_POSTS}')
+        self.assertContains(response, archive_url)
+
+        first = self.client.get(archive_url).context['page_obj']
+        self.assertEqual(len(first), NUMBER_OF_ENTIES)
+        second = self.client.get(
+            archive_url, {'after': first.next_cursor()}
+        ).context['page_obj']
+        self.assertEqual(len(second), OLD_POSTS - NUMBER_OF_ENTIES)
+        self.assertFalse(second.has_next())
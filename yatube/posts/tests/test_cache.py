@@ -0,0 +1,77 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..cache import fragment_cache, fragment_stats
+from ..models import Group, Post, User
+
+
+class PostFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='test_text',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        fragment_cache().clear()
+        fragment_stats.reset()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertStats(self, hits, misses):
+        self.assertEqual(
+            fragment_stats.as_dict(), {'hits': hits, 'misses': misses}
+        )
+
+    def test_feed_pages_reuse_fragments(self):
+        pages = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        ]
+        for page in pages:
+            self.client.get(page)
+        self.assertStats(0, len(pages))
+        for page in pages:
+            self.client.get(page)
+        self.assertStats(len(pages), len(pages))
+
+    def test_edit_invalidates_fragment(self):
+        self.client.get(reverse('posts:index'))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'new_text', 'group': self.group.pk}
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'new_text')
+        self.assertStats(0, 2)
+
+    def test_rename_invalidates_fragment(self):
+        self.client.get(reverse('posts:index'))
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new_slug'
+        group.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '/group/new_slug/')
+
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Иван'
+        user.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Иван')
+        self.assertStats(0, 3)
+
+    def test_group_delete_invalidates_fragment(self):
+        self.client.get(reverse('posts:index'))
+        Group.objects.get(pk=self.group.pk).delete()
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, '/group/test_slug/')
+        self.assertStats(0, 2)
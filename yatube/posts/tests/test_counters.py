@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from ..counters import author_posts_count
+from ..models import AuthorStats, Group, Post, User
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.another_group = Group.objects.create(
+            title='another_test_group',
+            slug='another_test_slug',
+            description='another_test_description',
+        )
+
+    def assertCounters(self, author, group, another_group):
+        self.assertEqual(author_posts_count(self.user), author)
+        self.group.refresh_from_db()
+        self.another_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.another_group.posts_count, another_group)
+
+    def test_create_edit_delete(self):
+        post = Post.objects.create(
+            author=self.user, text='test_text', group=self.group
+        )
+        Post.objects.create(author=self.user, text='test_text')
+        self.assertCounters(2, 1, 0)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assertCounters(2, 0, 1)
+
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_bulk_create(self):
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'test_{num}', group=self.group)
+            for num in range(5)
+        ])
+        self.assertCounters(5, 5, 0)
+
+    def test_recount_command(self):
+        Post.objects.create(
+            author=self.user, text='test_text', group=self.group
+        )
+        AuthorStats.objects.filter(author=self.user).update(posts_count=7)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=0)
+        with self.assertRaises(CommandError):
+            call_command('recount_posts', check=True, stdout=StringIO())
+        call_command('recount_posts', stdout=StringIO())
+        self.assertCounters(1, 1, 0)
+        call_command('recount_posts', check=True, stdout=StringIO())
@@ -0,0 +1,129 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..bulk import delete_posts
+from ..models import EditConflict, Group, Post, PostDraft, User
+
+
+class PostEditTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(title='group', slug='group')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='first'
+        )
+        self.url = reverse('posts:post_edit', kwargs={'post_id': self.post.pk})
+        self.client.force_login(self.user)
+
+    def edit(self, **data):
+        data = {'text': 'first', 'group': self.group.pk, **data}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, data)
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        return response, updates
+
+    def test_only_changed_columns_are_written(self):
+        response, updates = self.edit(text='second', version=0)
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"text"', updates[0])
+        self.assertIn('"version"', updates[0])
+        for column in ('"group_id"', '"author_id"', '"pub_date"', '"image"'):
+            self.assertNotIn(f'{column} =', updates[0])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.text, self.post.version), ('second', 1))
+
+    def test_unchanged_form_writes_nothing(self):
+        _, updates = self.edit(version=0)
+        self.assertEqual(updates, [])
+
+    def test_conflicting_edit_is_rejected(self):
+        other = Post.objects.get(pk=self.post.pk)
+        other.text = 'saved by someone else'
+        other.save()
+        response, _ = self.edit(text='stale', version=0)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'его изменили')
+        self.assertEqual(response.context['version'], 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'saved by someone else')
+        # после проверки пользователь сохраняет свою версию осознанно
+        self.edit(text='stale', version=response.context['version'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'stale')
+
+    def test_save_with_expected_version(self):
+        post = Post.objects.get(pk=self.post.pk)
+        Post.objects.filter(pk=post.pk).update(version=5)
+        post.text = 'late'
+        with self.assertRaises(EditConflict):
+            post.save(update_fields=['text'], expected_version=0)
+        self.assertEqual(post.version, 0)
+        post.save(update_fields=['text'], expected_version=5)
+        self.assertEqual(Post.objects.get(pk=post.pk).version, 6)
+
+
+class DraftTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='writer')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.post = Post.objects.create(author=cls.user, text='published')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.new_url = reverse('posts:new_post_draft')
+        self.post_url = reverse(
+            'posts:post_draft', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_autosave_does_not_touch_posts(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.new_url, {'text': 'draft 1'})
+            self.client.post(self.new_url, {'text': 'draft 2'})
+        self.assertEqual(response.status_code, 200)
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].startswith('SELECT')
+        ]
+        self.assertFalse(any('"posts_post"' in sql for sql in writes))
+        self.assertEqual(PostDraft.objects.get().text, 'draft 2')
+        draft = self.client.get(self.new_url).json()['draft']
+        self.assertEqual(draft['text'], 'draft 2')
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_publishing_drops_draft(self):
+        self.client.post(self.new_url, {'text': 'draft'})
+        self.client.post(self.post_url, {'text': 'edited draft'})
+        self.client.post(reverse('posts:post_create'), {'text': 'draft'})
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': 'edited draft', 'version': self.post.version}
+        )
+        self.assertFalse(PostDraft.objects.exists())
+        self.assertIsNone(self.client.get(self.new_url).json()['draft'])
+
+    def test_drafts_of_foreign_posts_are_hidden(self):
+        stranger = Client()
+        stranger.force_login(self.stranger)
+        self.assertEqual(
+            stranger.post(self.post_url, {'text': 'spam'}).status_code, 404
+        )
+        self.assertEqual(stranger.get(self.post_url).status_code, 404)
+
+    def test_bulk_delete_drops_drafts(self):
+        self.client.post(self.post_url, {'text': 'edited draft'})
+        self.assertEqual(delete_posts(Post.objects.all()), 1)
+        self.assertFalse(PostDraft.objects.exists())
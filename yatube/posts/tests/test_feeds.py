@@ -0,0 +1,96 @@
+import json
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Group, Post, User
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='текст <с разметкой>', group=cls.group
+        )
+        Post.objects.create(author=cls.user, text='без группы')
+        cls.urls = {
+            reverse('posts:index_feed', args=['atom']): 2,
+            reverse('posts:group_feed', args=['test_slug', 'rss']): 1,
+            reverse('posts:profile_feed', args=['test_user', 'json']): 2,
+        }
+
+    def read(self, url, **headers):
+        response = self.client.get(url, **headers)
+        return response, b''.join(response.streaming_content)
+
+    def test_formats(self):
+        for url, entries in self.urls.items():
+            with self.subTest(url=url):
+                response, content = self.read(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                if url.endswith('/json/'):
+                    items = json.loads(content)['items']
+                    self.assertEqual(items[0]['content_text'], 'без группы')
+                elif url.endswith('/atom/'):
+                    items = ElementTree.fromstring(content).findall(
+                        f'{ATOM}entry'
+                    )
+                else:
+                    items = ElementTree.fromstring(content).findall(
+                        'channel/item'
+                    )
+                    self.assertEqual(
+                        items[0].find('description').text, self.post.text
+                    )
+                self.assertEqual(len(items), entries)
+
+    def test_unknown_feeds(self):
+        for url in (
+            reverse('posts:index_feed', args=['xml']),
+            reverse('posts:group_feed', args=['no_group', 'atom']),
+            reverse('posts:profile_feed', args=['nobody', 'atom']),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_get(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_edit_changes_etag(self):
+        url = reverse('posts:group_feed', args=['test_slug', 'atom'])
+        etag = self.client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'новый текст'
+        post.save()
+        response, content = self.read(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('новый текст', content.decode())
+
+    def test_if_modified_since_is_ignored(self):
+        url = reverse('posts:index_feed', args=['atom'])
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        Post.objects.get(pk=self.post.pk).delete()
+        response, content = self.read(
+            url, HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2090 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn('с разметкой', content.decode())
@@ -0,0 +1,145 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from .. import bulk
+from ..models import Follow, Group, GroupFollow, Post, TimelineEntry, User
+from .utils import QueryCountMixin
+
+
+class FollowFeedTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_backfills_and_fans_out(self):
+        old = Post.objects.create(author=self.author, text='old')
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'})
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+        )
+        new = Post.objects.create(author=self.author, text='new')
+        Post.objects.create(author=self.stranger, text='stranger')
+        self.assertEqual(self.feed(), [new, old])
+        self.assertEqual(self.author.stats.followers_count, 1)
+
+        self.client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_group_follow_keeps_group_posts(self):
+        in_group = Post.objects.create(
+            author=self.author, text='group', group=self.group
+        )
+        Post.objects.create(author=self.author, text='no group')
+        Follow.objects.create(user=self.reader, author=self.author)
+        GroupFollow.objects.create(user=self.reader, group=self.group)
+        stranger_post = Post.objects.create(
+            author=self.stranger, text='stranger', group=self.group
+        )
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(self.feed(), [stranger_post, in_group])
+
+    def test_cannot_follow_self(self):
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'reader'})
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    @override_settings(POSTS_TIMELINE_LENGTH=3)
+    def test_timeline_is_trimmed(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'test_{num}')
+            for num in range(5)
+        ]
+        self.assertEqual(
+            TimelineEntry.objects.filter(reader=self.reader).count(), 3
+        )
+        self.assertEqual(self.feed(), posts[:1:-1])
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=1)
+    def test_prolific_author_is_read_on_demand(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.stranger, author=self.author)
+        post = Post.objects.create(author=self.author, text='test_text')
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post])
+
+    def test_feed_queries(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        for num in range(15):
+            Post.objects.create(author=self.author, text=f'test_{num}')
+        # сессия, пользователь, авторы без рассылки и страница ленты
+        self.assertViewQueries(
+            reverse('posts:follow_index'), 4, client=self.client
+        )
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=1)
+    def test_merged_pages(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.stranger, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.stranger)
+        posts = [
+            Post.objects.create(
+                author=(self.author, self.stranger)[num % 2],
+                text=f'test_{num}',
+            )
+            for num in range(15)
+        ][::-1]
+        self.assertEqual(TimelineEntry.objects.count(), 7)
+        first = self.client.get(
+            reverse('posts:follow_index')
+        ).context['page_obj']
+        self.assertEqual(list(first), posts[:10])
+        second = self.client.get(
+            reverse('posts:follow_index'), {'after': first.next_cursor()}
+        ).context['page_obj']
+        self.assertEqual(list(second), posts[10:])
+        self.assertFalse(second.has_next())
+        back = self.client.get(
+            reverse('posts:follow_index'),
+            {'before': second.previous_cursor()}
+        ).context['page_obj']
+        self.assertEqual(list(back), posts[:10])
+
+    def test_group_change_moves_timeline_entries(self):
+        other_group = Group.objects.create(title='other', slug='other')
+        GroupFollow.objects.create(user=self.reader, group=self.group)
+        GroupFollow.objects.create(user=self.stranger, group=other_group)
+        post = Post.objects.create(
+            author=self.author, text='test_text', group=self.group
+        )
+        self.assertEqual(self.feed(), [post])
+        post.group = other_group
+        post.save()
+        self.assertEqual(self.feed(), [])
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('reader', flat=True)),
+            [self.stranger.pk]
+        )
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        bulk.move_to_group(Post.objects.all(), self.group)
+        self.assertEqual(self.feed(), [post])
+        self.assertFalse(
+            TimelineEntry.objects.filter(reader=self.stranger).exists()
+        )
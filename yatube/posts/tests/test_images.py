@@ -0,0 +1,88 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.views import MEDIA_MAX_AGE, media
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(name='photo.png', size=(400, 200)):
+    output = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='photographer')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        caches['default'].clear()
+        caches['fragments'].clear()
+        self.client.force_login(self.user)
+
+    def create_post(self, image):
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'С картинкой', 'image': image},
+        )
+        return Post.objects.get(text='С картинкой')
+
+    def test_image_name_is_content_hash(self):
+        image = make_image('Photo.PNG')
+        digest = hashlib.sha1(image.read()).hexdigest()
+        image.seek(0)
+        post = self.create_post(image)
+        self.assertEqual(post.image.name, f'posts/{digest[:2]}/{digest}.png')
+
+    def test_same_image_is_stored_once(self):
+        first = self.create_post(make_image())
+        first.text = 'Первая'
+        first.save()
+        second = self.create_post(make_image('other.png'))
+        self.assertEqual(second.image.name, first.image.name)
+        directory = os.path.dirname(second.image.path)
+        self.assertEqual(os.listdir(directory), [
+            os.path.basename(second.image.name)
+        ])
+
+    def test_feeds_read_thumbnails_from_kvstore(self):
+        self.create_post(make_image())
+        # миниатюры сделаны при загрузке, их размеры лежат в хранилище
+        # sorl, поэтому ленте файлы на диске больше не нужны
+        shutil.rmtree(TEMP_MEDIA_ROOT)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertContains(response, ' 2x"')
+
+    def test_posts_without_image(self):
+        Post.objects.create(author=self.user, text='Без картинки')
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'card-img')
+
+    def test_media_is_cached_for_a_year(self):
+        post = self.create_post(make_image())
+        request = RequestFactory().get(post.image.url)
+        response = media(request, post.image.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'max-age={MEDIA_MAX_AGE}', response['Cache-Control'])
+        self.assertIn('immutable', response['Cache-Control'])
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from ..models import Follow, Group, Post, User
+from .utils import QueryPlanMixin
+
+AUTHORS = 20
+GROUPS = 10
+POSTS = 4000
+
+
+class FeedIndexTests(QueryPlanMixin, TestCase):
+    """Feeds read posts in index order instead of sorting the table."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        authors = [
+            User.objects.create_user(username=f'author_{num}')
+            for num in range(AUTHORS)
+        ]
+        groups = [
+            Group.objects.create(title=f'group_{num}', slug=f'group_{num}')
+            for num in range(GROUPS)
+        ]
+        Post.objects.bulk_create(
+            Post(
+                author=authors[num % AUTHORS],
+                group=groups[num % GROUPS] if num % 3 else None,
+                text=f'text_{num}',
+            )
+            for num in range(POSTS)
+        )
+        cls.author = authors[0]
+        cls.prolific = authors[1]
+        cls.group = groups[1]
+        cls.analyze()
+
+    @classmethod
+    def analyze(cls):
+        # планировщик выбирает индексы по статистике, как на живой базе
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_feeds_use_indexes(self):
+        feeds = {
+            reverse('posts:index'): 'post_pub_date_id_idx',
+            reverse('posts:index') + '?page=50': 'post_pub_date_id_idx',
+            reverse(
+                'posts:group_list', kwargs={'slug': self.group.slug}
+            ): 'post_group_pub_date_idx',
+            reverse(
+                'posts:profile', kwargs={'username': self.author.username}
+            ): 'post_author_pub_date_idx',
+        }
+        for url, index in feeds.items():
+            with self.subTest(url=url):
+                self.assertFeedUsesIndex(url, index)
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=1)
+    def test_follow_feed_uses_indexes(self):
+        reader = User.objects.create_user(username='reader')
+        for user in (User.objects.create_user(username='fan'), reader):
+            Follow.objects.create(user=user, author=self.prolific)
+        Follow.objects.create(user=reader, author=self.author)
+        self.analyze()
+        client = Client()
+        client.force_login(reader)
+        url = reverse('posts:follow_index')
+        # доставленные посты идут по ленте читателя, посты автора
+        # с множеством подписчиков - по индексу автора, без сортировки
+        self.assertFeedUsesIndex(
+            url, 'timeline_reader_pub_date_idx', client,
+            table='posts_timelineentry',
+        )
+        self.assertFeedUsesIndex(url, 'post_author_pub_date_idx', client)
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from ..cache import page_cache, page_stats
+from ..models import Group, Post, User
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=60)
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.another_user = User.objects.create_user(username='another_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.another_group = Group.objects.create(
+            title='another_test_group',
+            slug='another_test_slug',
+            description='another_test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='test_text',
+            group=cls.group,
+        )
+        cls.pages = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'another_group': reverse(
+                'posts:group_list', kwargs={'slug': cls.another_group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user.username}
+            ),
+            'another_profile': reverse(
+                'posts:profile',
+                kwargs={'username': cls.another_user.username}
+            ),
+        }
+
+    def setUp(self):
+        page_cache().clear()
+        page_stats.reset()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.another_user)
+
+    def assertCached(self, names):
+        page_stats.reset()
+        for name in self.pages:
+            self.client.get(self.pages[name])
+        self.assertEqual(page_stats.hits, len(names))
+
+    def test_pages_are_cached_for_anonymous_only(self):
+        self.assertCached([])
+        self.assertCached(self.pages)
+        page_stats.reset()
+        response = self.authorized_client.get(self.pages['index'])
+        self.assertEqual(page_stats.as_dict(), {'hits': 0, 'misses': 0})
+        self.assertContains(response, 'Новая запись')
+
+    def test_new_post_purges_dependent_pages(self):
+        self.assertCached([])
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'new_text', 'group': self.another_group.pk}
+        )
+        self.assertCached(['group', 'profile'])
+        response = self.client.get(self.pages['another_group'])
+        self.assertContains(response, 'new_text')
+
+    def test_edit_purges_old_and_new_group(self):
+        self.assertCached([])
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assertCached(['another_profile'])
+
+    def test_conditional_get(self):
+        response = self.client.get(self.pages['index'])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.client.get(
+            self.pages['index'], HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            self.pages['index'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_group_delete_purges_pages(self):
+        self.assertCached([])
+        Group.objects.get(pk=self.group.pk).delete()
+        response = self.client.get(self.pages['profile'])
+        self.assertNotContains(response, self.pages['group'])
@@ -0,0 +1,106 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ..models import Post, User
+from ..paginators import (
+    CountedPaginator, CursorPage, CursorPaginator, InvalidCursor,
+    decode_cursor, encode_cursor
+)
+from ..utils import NUMBER_OF_ENTIES
+
+
+NUMBER_OF_POSTS = 25
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        for num in range(NUMBER_OF_POSTS):
+            Post.objects.create(author=cls.user, text=f'test_text_{num}')
+        cls.ordered = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def test_walk_forward_and_back(self):
+        paginator = CursorPaginator(Post.objects.all(), NUMBER_OF_ENTIES)
+        first = paginator.cursor_page()
+        self.assertEqual(list(first), self.ordered[:NUMBER_OF_ENTIES])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.cursor_page(after=first.next_cursor())
+        self.assertEqual(
+            list(second), self.ordered[NUMBER_OF_ENTIES:2 * NUMBER_OF_ENTIES]
+        )
+        third = paginator.cursor_page(after=second.next_cursor())
+        self.assertEqual(len(third), NUMBER_OF_POSTS % NUMBER_OF_ENTIES)
+        self.assertFalse(third.has_next())
+
+        back = paginator.cursor_page(before=third.previous_cursor())
+        self.assertEqual(list(back), list(second))
+        back = paginator.cursor_page(before=back.previous_cursor())
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_past_the_end(self):
+        paginator = CursorPaginator(Post.objects.all(), NUMBER_OF_ENTIES)
+        page = paginator.cursor_page(after=encode_cursor(self.ordered[-1]))
+        self.assertEqual(len(page), 0)
+        self.assertIsNone(page.previous_cursor())
+        self.assertIsNone(page.next_cursor())
+
+    def test_broken_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not a cursor')
+        paginator = CursorPaginator(Post.objects.all(), NUMBER_OF_ENTIES)
+        page = paginator.get_cursor_page(after='broken')
+        self.assertEqual(list(page), self.ordered[:NUMBER_OF_ENTIES])
+
+    def test_views_switch_to_cursor_mode(self):
+        first = self.client.get(reverse('posts:index'))
+        self.assertNotIsInstance(first.context['page_obj'], CursorPage)
+        with override_settings(POSTS_CURSOR_PAGINATION=True):
+            first = self.client.get(reverse('posts:index'))
+        page_obj = first.context['page_obj']
+        self.assertContains(first, f'?after={page_obj.next_cursor()}')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            {'after': page_obj.next_cursor()}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']),
+            self.ordered[NUMBER_OF_ENTIES:2 * NUMBER_OF_ENTIES]
+        )
+
+
+class ElidedPageRangeTests(TestCase):
+    def page_range(self, number, num_pages):
+        paginator = CountedPaginator(
+            Post.objects.none(), NUMBER_OF_ENTIES,
+            count=num_pages * NUMBER_OF_ENTIES
+        )
+        return list(paginator.get_elided_page_range(number))
+
+    def test_window(self):
+        gap = CountedPaginator.ELLIPSIS
+        cases = (
+            (1, 5, [1, 2, 3, 4, 5]),
+            (1, 100, [1, 2, 3, 4, gap, 100]),
+            (5, 100, [1, 2, 3, 4, 5, 6, 7, 8, gap, 100]),
+            (50, 100, [1, gap, 47, 48, 49, 50, 51, 52, 53, gap, 100]),
+            (100, 100, [1, gap, 97, 98, 99, 100]),
+        )
+        for number, num_pages, expected in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(self.page_range(number, num_pages), expected)
+
+    def test_deep_feed_renders_window(self):
+        user = User.objects.create_user(username='writer')
+        Post.objects.bulk_create(
+            Post(author=user, text=f'text_{num}')
+            for num in range(NUMBER_OF_ENTIES * 30)
+        )
+        response = self.client.get(reverse('posts:index'), {'page': 15})
+        self.assertContains(response, '?page=30"')
+        self.assertContains(response, '?page=12"')
+        self.assertNotContains(response, '?page=11"')
+        self.assertContains(response, CountedPaginator.ELLIPSIS, count=2)
@@ -0,0 +1,52 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..models import Group, Post, User
+from .utils import QueryCountMixin
+
+
+NUMBER_OF_POSTS = 15
+
+
+class FeedQueriesTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        for num in range(NUMBER_OF_POSTS):
+            author = User.objects.create_user(username=f'user_{num}')
+            Post.objects.create(
+                author=author, text=f'test_text_{num}', group=cls.group
+            )
+        cls.user = author
+        cls.post = Post.objects.latest('pub_date')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_pages(self):
+        pages = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}): 2,
+            reverse(
+                'posts:profile', kwargs={'username': self.user.username}
+            ): 3,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 2,
+        }
+        for url, num in pages.items():
+            with self.subTest(url=url):
+                self.assertViewQueries(url, num)
+
+    def test_authorized_pages(self):
+        pages = {
+            reverse('posts:index'): 4,
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}): 4,
+            reverse('posts:post_create'): 3,
+        }
+        for url, num in pages.items():
+            with self.subTest(url=url):
+                self.assertViewQueries(url, num, self.authorized_client)
@@ -0,0 +1,84 @@
+import sqlite3
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Post, User
+from ..search import FTS_TABLE, match_expression, search_posts, stem
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Красивые кошки гуляли по крышам'
+        )
+        Post.objects.create(author=cls.user, text='Собаки спали дома')
+
+    def test_stem(self):
+        words = {
+            'кошки': 'кошк',
+            'красивая': 'красив',
+            'гуляли': 'гуля',
+            'возможности': 'возможн',
+            'важнейшие': 'важн',
+            'ёжик': 'ежик',
+        }
+        for word, expected in words.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+    def test_search_uses_word_forms(self):
+        found = search_posts(Post.objects.all(), 'красивая кошка')
+        self.assertEqual(list(found), [self.post])
+        self.assertFalse(search_posts(Post.objects.all(), 'птицы').exists())
+
+    def test_index_follows_edit_and_delete(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Птицы пели'
+        post.save()
+        self.assertFalse(search_posts(Post.objects.all(), 'кошки').exists())
+        self.assertTrue(search_posts(Post.objects.all(), 'птица').exists())
+        post.delete()
+        self.assertFalse(search_posts(Post.objects.all(), 'птица').exists())
+
+    def test_bulk_created_posts_are_indexed(self):
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Рыбы плавали {num}')
+            for num in range(3)
+        ])
+        found = search_posts(Post.objects.all(), 'рыба')
+        self.assertEqual(found.count(), 3)
+
+    def test_search_page(self):
+        response = self.client.get(reverse('posts:search'), {'q': 'кошками'})
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertContains(response, self.post.text)
+        response = self.client.get(reverse('posts:search'))
+        self.assertIsNone(response.context['page_obj'])
+
+    def test_index_is_plain_sql(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'posts_post'"
+            )
+            triggers = [row[0] for row in cursor.fetchall()]
+        self.assertEqual(len(triggers), 3)
+        # запись без функций Django, как из консоли sqlite3
+        raw = sqlite3.connect(':memory:')
+        raw.execute('CREATE TABLE posts_post (id INTEGER PRIMARY KEY, text)')
+        raw.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(body)')
+        for sql in triggers:
+            raw.execute(sql)
+        raw.execute("INSERT INTO posts_post VALUES (1, 'Ёлки зелёные')")
+        raw.execute("UPDATE posts_post SET text = 'Ёлки' WHERE id = 1")
+        self.assertEqual(
+            raw.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?',
+                [match_expression('ёлка')]
+            ).fetchall(),
+            [(1,)]
+        )
@@ -0,0 +1,71 @@
+import os
+import re
+from datetime import datetime, timezone
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Follow, Group, Post, User
+
+SNAPSHOTS = os.path.join(os.path.dirname(__file__), 'snapshots')
+# UPDATE_SNAPSHOTS=1 перезаписывает эталоны текущей вёрсткой
+UPDATE = os.getenv('UPDATE_SNAPSHOTS') == '1'
+MAIN_RE = re.compile(r'<main>.*</main>', re.S)
+
+
+class FeedSnapshotTests(TestCase):
+    """Post lists render exactly the stored HTML."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='лев_толстой', first_name='Лев', last_name='Толстой'
+        )
+        cls.nameless = User.objects.create_user(username='no_name')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Классика <и> всё', slug='classics', description='Книги'
+        )
+        for num in range(12):
+            Post.objects.create(
+                pk=1000 + num,
+                author=cls.author if num % 3 else cls.nameless,
+                group=cls.group if num % 2 else None,
+                text=f'Война и мир, том {num} & "цитата"',
+            )
+            Post.objects.filter(pk=1000 + num).update(
+                pub_date=datetime(2021, 12, 31 - num, 22, 30,
+                                  tzinfo=timezone.utc)
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        caches['fragments'].clear()
+
+    def assertMatchesSnapshot(self, name, response):
+        main = MAIN_RE.search(response.content.decode()).group()
+        path = os.path.join(SNAPSHOTS, f'{name}.html')
+        if UPDATE:
+            with open(path, 'w') as snapshot:
+                snapshot.write(main)
+        with open(path) as snapshot:
+            self.assertEqual(main, snapshot.read())
+
+    def test_feeds(self):
+        pages = {
+            'index': reverse('posts:index'),
+            'index_page_2': reverse('posts:index') + '?page=2',
+            'group_list': reverse('posts:group_list', args=['classics']),
+            'profile': reverse('posts:profile', args=['лев_толстой']),
+            'search': reverse('posts:search') + '?q=война',
+        }
+        for name, url in pages.items():
+            with self.subTest(name=name):
+                self.assertMatchesSnapshot(name, self.client.get(url))
+
+    def test_follow_feed(self):
+        self.client.force_login(self.reader)
+        self.assertMatchesSnapshot(
+            'follow', self.client.get(reverse('posts:follow_index'))
+        )
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from ..counters import author_posts_count, count_posts
+from ..models import Group, Post, User
+from ..transfer import insert_posts
+
+
+class PostTransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test_user', first_name='Имя'
+        )
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        Post.objects.create(author=cls.user, text='первый', group=cls.group)
+        Post.objects.create(author=cls.user, text='второй, с "кавычками"')
+
+    def snapshot(self):
+        return list(Post.objects.order_by('pk').values_list(
+            'text', 'pub_date', 'author__username', 'author__first_name',
+            'group__slug', 'group__title',
+        ))
+
+    def roundtrip(self, fmt):
+        before = self.snapshot()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f'posts.{fmt}')
+            call_command('export_posts', output=path, stderr=StringIO())
+            User.objects.all().delete()
+            Group.objects.all().delete()
+            call_command(
+                'import_posts', path, batch_size=1, stdout=StringIO()
+            )
+        self.assertEqual(self.snapshot(), before)
+        author = User.objects.get(username='test_user')
+        self.assertFalse(author.has_usable_password())
+        self.assertEqual(author_posts_count(author), 2)
+        self.assertEqual(Group.objects.get().posts_count, 1)
+
+    def test_jsonl_roundtrip(self):
+        self.roundtrip('jsonl')
+
+    def test_csv_roundtrip(self):
+        self.roundtrip('csv')
+
+    def test_existing_authors_and_groups_are_reused(self):
+        out = StringIO()
+        call_command(
+            'export_posts', group='test_slug', stdout=out, stderr=StringIO()
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as dump:
+            dump.write(out.getvalue())
+            dump.flush()
+            call_command('import_posts', dump.name, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Group.objects.count(), 1)
+        # тот же пост уже есть, повторная загрузка его не дублирует
+        self.assertEqual(Post.objects.filter(text='первый').count(), 1)
+
+    def test_saves_during_import_keep_their_date(self):
+        saved = []
+
+        def save_post(posts, delta):
+            # другой поток того же процесса сохраняет пост посреди загрузки
+            saved.append(Post.objects.create(author=self.user, text='новый'))
+            count_posts(posts, delta)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as dump:
+            dump.write(json.dumps({
+                'text': 'старый', 'author': 'test_user',
+                'pub_date': '2001-02-03T04:05:06+00:00',
+            }) + '\n')
+            dump.flush()
+            with mock.patch('posts.counters.count_posts', save_post):
+                call_command('import_posts', dump.name, stdout=StringIO())
+        self.assertEqual(Post.objects.get(text='старый').pub_date.year, 2001)
+        self.assertEqual(
+            saved[0].pub_date.date(), timezone.now().date()
+        )
+
+    def test_insert_keeps_dates_in_every_batch(self):
+        dates = [
+            timezone.now() - timedelta(days=days)
+            for days in (3, 2, 1)
+        ]
+        posts = [
+            Post(author=self.user, text=f'пост {number}', pub_date=date)
+            for number, date in enumerate(dates)
+        ]
+        insert_posts(posts, batch_size=2)
+        self.assertEqual(
+            list(Post.objects.filter(text__startswith='пост ').order_by(
+                'pk'
+            ).values_list('pub_date', flat=True)),
+            dates
+        )
+        self.assertEqual(author_posts_count(self.user), 5)
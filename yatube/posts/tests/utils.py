@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    """Pin the number of SQL queries a page costs."""
+
+    def assertViewQueries(self, url, num, client=None):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        executed = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(
+            len(executed), num,
+            f'{url}: {len(executed)} queries instead of {num}:\n'
+            + '\n'.join(executed)
+        )
+        return response
+
+
+class QueryPlanMixin:
+    """Check with ``EXPLAIN`` that a page reads posts through an index."""
+
+    def feed_query(self, url, client=None, table='posts_post'):
+        """SQL of the query that selects the posts of the page."""
+        client = client or self.client
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        for query in context.captured_queries:
+            sql = query['sql']
+            if sql.startswith('SELECT') and all(
+                part in sql for part in (f'FROM "{table}"', 'ORDER BY')
+            ):
+                return sql
+        self.fail(f'{url}: no query selects from {table}')
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+
+    def assertFeedUsesIndex(self, url, index, client=None,
+                            table='posts_post'):
+        plan = self.query_plan(self.feed_query(url, client, table))
+        text = '\n'.join(plan)
+        self.assertIn(index, text, f'{url}: {index} is not used:\n{text}')
+        for step in plan:
+            # SQLite: USE TEMP B-TREE FOR ORDER BY, PostgreSQL: Sort
+            self.assertNotIn('TEMP B-TREE', step, f'{url} sorts:\n{text}')
+            self.assertFalse(
+                step.strip(' ->').startswith('Sort'), f'{url} sorts:\n{text}'
+            )
@@ -0,0 +1,26 @@
+"""Thumbnails of post images in the sizes of ``POSTS_THUMBNAILS``.
+
+A task makes them right after upload. sorl-thumbnail keeps their names
+and dimensions in its key-value store, so pages showing them read the
+cache or the database instead of the image files.
+"""
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from .models import Post
+
+
+def thumbnail(image, size):
+    geometry, options = settings.POSTS_THUMBNAILS[size]
+    return get_thumbnail(image, geometry, **options)
+
+
+@task()
+def make_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    for size in settings.POSTS_THUMBNAILS:
+        thumbnail(post.image, size)
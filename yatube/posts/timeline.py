@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from core.tasks import task
+
+from .models import AuthorStats, Follow, GroupFollow, Post, TimelineEntry
+from .paginators import keyset
+
+
+def is_pulled(author_id):
+    """Whether posts of the author are read from ``posts_post`` directly.
+
+    Fan-out of authors with very many followers would cost a write per
+    follower, so their posts are merged into the feed at read time.
+    """
+    return AuthorStats.objects.filter(
+        author_id=author_id,
+        followers_count__gt=settings.POSTS_FANOUT_MAX_FOLLOWERS,
+    ).exists()
+
+
+def deliver(posts, readers):
+    """Put ``posts`` into the timelines of ``readers``."""
+    entries = [
+        TimelineEntry(reader_id=reader_id, post=post, pub_date=post.pub_date)
+        for post in posts
+        for reader_id in readers
+    ]
+    with transaction.atomic():
+        TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+        trim(readers)
+
+
+def trim(readers):
+    """Keep only ``POSTS_TIMELINE_LENGTH`` newest entries per reader."""
+    oldest_kept = TimelineEntry.objects.filter(
+        reader=OuterRef('reader')
+    ).order_by('-pub_date').values('pub_date')[
+        settings.POSTS_TIMELINE_LENGTH - 1:settings.POSTS_TIMELINE_LENGTH
+    ]
+    TimelineEntry.objects.filter(
+        reader__in=readers, pub_date__lt=Subquery(oldest_kept)
+    ).delete()
+
+
+@task()
+def fan_out(post_id):
+    """Deliver a new post to followers of its author and group."""
+    post = Post.objects.filter(pk=post_id).only(
+        'pub_date', 'author', 'group'
+    ).first()
+    if post is None:
+        return
+    readers = set(
+        GroupFollow.objects.filter(group_id=post.group_id).values_list(
+            'user_id', flat=True
+        )
+    ) if post.group_id else set()
+    if not is_pulled(post.author_id):
+        readers.update(
+            Follow.objects.filter(author_id=post.author_id).values_list(
+                'user_id', flat=True
+            )
+        )
+    if readers:
+        deliver([post], readers)
+
+
+def latest_posts(**filters):
+    return Post.objects.filter(**filters).only('pk', 'pub_date').order_by(
+        '-pub_date', '-pk'
+    )[:settings.POSTS_TIMELINE_LENGTH]
+
+
+@task()
+def backfill_author(user_id, author_id):
+    if not is_pulled(author_id):
+        deliver(latest_posts(author_id=author_id), [user_id])
+
+
+@task()
+def backfill_group(user_id, group_id):
+    deliver(latest_posts(group_id=group_id), [user_id])
+
+
+@task()
+def prune_author(user_id, author_id):
+    """Drop posts of an unfollowed author unless a followed group has them."""
+    TimelineEntry.objects.filter(
+        reader_id=user_id, post__author_id=author_id
+    ).exclude(
+        post__group__following__user_id=user_id
+    ).delete()
+
+
+@task()
+def prune_group(user_id, group_id):
+    TimelineEntry.objects.filter(
+        reader_id=user_id, post__group_id=group_id
+    ).exclude(
+        post__author__following__user_id=user_id
+    ).delete()
+
+
+@task()
+def move_deliveries(post_ids, old_group_id):
+    """Follow a group change of posts in timelines of group followers.
+
+    Followers of the old group lose the posts unless they follow the
+    author; followers of the new group get them.
+    """
+    if old_group_id is not None:
+        follows_author = Follow.objects.filter(
+            user=OuterRef('reader'), author=OuterRef('post__author')
+        )
+        stale = TimelineEntry.objects.filter(
+            post_id__in=post_ids,
+            reader__in=GroupFollow.objects.filter(
+                group_id=old_group_id
+            ).values('user_id'),
+        ).annotate(
+            follows_author=Exists(follows_author)
+        ).filter(follows_author=False).values_list('pk', flat=True)
+        TimelineEntry.objects.filter(pk__in=list(stale)).delete()
+    posts = Post.objects.filter(
+        pk__in=post_ids, group__isnull=False
+    ).only('pub_date', 'group')
+    by_group = {}
+    for post in posts:
+        by_group.setdefault(post.group_id, []).append(post)
+    for group_id, group_posts in by_group.items():
+        readers = set(
+            GroupFollow.objects.filter(group_id=group_id).values_list(
+                'user_id', flat=True
+            )
+        )
+        if readers:
+            deliver(group_posts, readers)
+
+
+def timeline_sources(reader):
+    """Queries of the reader's follow feed for ``MergedCursorPaginator``.
+
+    Delivered posts are read along the reader's timeline index, posts of
+    every pulled author along the author's index, each query with its own
+    ``LIMIT``.
+    """
+    def delivered(cursor, forward, limit):
+        entries = keyset(
+            TimelineEntry.objects.select_related(
+                'post__author', 'post__group'
+            ).defer(
+                'post__author__password',
+                'post__author__last_login',
+                'post__group__description',
+            ),
+            cursor, forward, fields=('pub_date', 'post_id'), reader=reader,
+        )
+        return [entry.post for entry in entries[:limit]]
+
+    def pulled(author_id):
+        return lambda cursor, forward, limit: keyset(
+            Post.objects.feed(), cursor, forward, author_id=author_id
+        )[:limit]
+
+    pulled_authors = Follow.objects.filter(
+        user=reader,
+        author__stats__followers_count__gt=settings.POSTS_FANOUT_MAX_FOLLOWERS,
+    ).values_list('author_id', flat=True)
+    return [delivered] + [pulled(author_id) for author_id in pulled_authors]
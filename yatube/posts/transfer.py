@@ -0,0 +1,184 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import PAGES_TAG, invalidate_pages
+from .models import Group, Post, User
+
+FIELDS = (
+    'text', 'pub_date', 'author', 'author_first_name', 'author_last_name',
+    'group', 'group_title', 'group_description',
+)
+FORMATS = ('jsonl', 'csv')
+# pk и дата на пост: меньше лимита SQLite в 999 параметров
+UPDATE_BATCH_SIZE = 300
+
+
+def guess_format(path):
+    return 'csv' if path and path.endswith('.csv') else 'jsonl'
+
+
+def post_row(post):
+    group = post.group
+    return {
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'author_first_name': post.author.first_name,
+        'author_last_name': post.author.last_name,
+        'group': group.slug if group else '',
+        'group_title': group.title if group else '',
+        'group_description': group.description if group else '',
+    }
+
+
+def export_posts(queryset, stream, fmt, chunk_size=2000):
+    """Write posts to ``stream`` without loading them all into memory."""
+    posts = queryset.select_related('author', 'group').order_by('pk')
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+    for post in posts.iterator(chunk_size=chunk_size):
+        write(post_row(post))
+        yield post
+
+
+def read_rows(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_posts(posts, batch_size=UPDATE_BATCH_SIZE):
+    """``bulk_create`` that stores ``pub_date`` as given.
+
+    ``auto_now_add`` sets the date of new rows to now, so the dates from
+    the dump are written back by one ``UPDATE`` per ``batch_size`` posts.
+    """
+    dates = [post.pub_date for post in posts]
+    with transaction.atomic():
+        last = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        last = last.first() or 0
+        Post.objects.bulk_create(posts)
+        if posts and posts[0].pk is None:
+            # SQLite не возвращает id; до конца транзакции база заблокирована
+            # на запись, поэтому новые строки идут подряд после last
+            pks = Post.objects.filter(pk__gt=last).order_by('pk')
+            pks = pks.values_list('pk', flat=True)[:len(posts)]
+            for post, pk in zip(posts, pks):
+                post.pk = pk
+        for chunk in chunks(zip(posts, dates), batch_size):
+            when = [When(pk=post.pk, then=Value(date)) for post, date in chunk]
+            Post.objects.filter(pk__in=[post.pk for post, _ in chunk]).update(
+                pub_date=Case(*when, output_field=DateTimeField())
+            )
+        for post, date in zip(posts, dates):
+            post.pub_date = date
+
+
+def existing_keys(posts):
+    """``(author_id, pub_date)`` of ``posts`` that are already stored."""
+    return set(Post.objects.filter(
+        author_id__in={post.author_id for post in posts},
+        pub_date__in={post.pub_date for post in posts},
+    ).values_list('author_id', 'pub_date'))
+
+
+def resolve_authors(rows):
+    """Map usernames of a chunk to ids, creating the missing users."""
+    names = {row['author'] for row in rows}
+    authors = dict(
+        User.objects.filter(username__in=names).values_list('username', 'pk')
+    )
+    missing = {}
+    for row in rows:
+        if row['author'] not in authors:
+            missing.setdefault(row['author'], User(
+                username=row['author'],
+                first_name=row.get('author_first_name') or '',
+                last_name=row.get('author_last_name') or '',
+                password=make_password(None),
+            ))
+    if missing:
+        User.objects.bulk_create(missing.values())
+        authors.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+    return authors
+
+
+def resolve_groups(rows):
+    """Map group slugs of a chunk to ids, creating the missing groups."""
+    slugs = {row['group'] for row in rows if row.get('group')}
+    groups = dict(
+        Group.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+    )
+    missing = {}
+    for row in rows:
+        slug = row.get('group')
+        if slug and slug not in groups:
+            missing.setdefault(slug, Group(
+                slug=slug,
+                title=row.get('group_title') or slug,
+                description=row.get('group_description') or '',
+            ))
+    if missing:
+        Group.objects.bulk_create(missing.values())
+        groups.update(
+            Group.objects.filter(slug__in=missing).values_list('slug', 'pk')
+        )
+    return groups
+
+
+def import_posts(rows, batch_size=1000):
+    """Create posts from rows in batches; yields the size of each batch.
+
+    A post whose author already has a post with the same ``pub_date`` is
+    skipped, so importing the same dump again adds nothing.
+    """
+    for chunk in chunks(rows, batch_size):
+        with transaction.atomic():
+            authors = resolve_authors(chunk)
+            groups = resolve_groups(chunk)
+            posts = [
+                Post(
+                    text=row['text'],
+                    pub_date=parse_datetime(row.get('pub_date') or '')
+                    or timezone.now(),
+                    author_id=authors[row['author']],
+                    group_id=groups.get(row.get('group')),
+                )
+                for row in chunk
+            ]
+            existing = existing_keys(posts)
+            posts = [
+                post for post in posts
+                if (post.author_id, post.pub_date) not in existing
+            ]
+            insert_posts(posts)
+        yield len(posts)
+    invalidate_pages(PAGES_TAG)
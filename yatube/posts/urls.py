@@ -1,12 +1,31 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 app_name = "posts"
 urlpatterns = [
     path('', views.index, name="index"),
     path('group/<slug:slug>/', views.group_posts, name="group_list"),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/archive/', views.profile_archive,
+         name='profile_archive'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('posts/draft/', views.post_draft, name='new_post_draft'),
+    path('posts/<int:post_id>/draft/', views.post_draft, name='post_draft'),
+    path('search/', views.search, name='search'),
+    path('feed/<str:fmt>/', feeds.index_feed, name='index_feed'),
+    path('group/<slug:slug>/feed/<str:fmt>/', feeds.group_feed,
+         name='group_feed'),
+    path('profile/<str:username>/feed/<str:fmt>/', feeds.profile_feed,
+         name='profile_feed'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
+    path('group/<slug:slug>/follow/', views.group_follow,
+         name='group_follow'),
+    path('group/<slug:slug>/unfollow/', views.group_unfollow,
+         name='group_unfollow'),
 ]
@@ -0,0 +1,68 @@
+from urllib.parse import quote
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import dateformat, timezone
+from django.utils.http import RFC3986_SUBDELIMS
+
+from .paginators import CountedPaginator, CursorPaginator
+
+NUMBER_OF_ENTIES = 10
+PUB_DATE_FORMAT = 'd E Y'
+URL_PLACEHOLDER = '2147483647'
+
+
+def paginate(request, queryset, count=None):
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before or settings.POSTS_CURSOR_PAGINATION:
+        paginator = CursorPaginator(queryset, NUMBER_OF_ENTIES)
+        return paginator.get_cursor_page(after=after, before=before)
+    paginator = CountedPaginator(queryset, NUMBER_OF_ENTIES, count=count)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def url_pattern(viewname, kwarg):
+    """Reverse a URL once and fill its single argument by formatting.
+
+    The value is quoted the way ``reverse()`` quotes it.
+    """
+    prefix, suffix = reverse(
+        viewname, kwargs={kwarg: URL_PLACEHOLDER}
+    ).split(URL_PLACEHOLDER)
+
+    def build(value):
+        quoted = quote(str(value), safe=RFC3986_SUBDELIMS + '/~:@')
+        return f'{prefix}{quoted}{suffix}'
+    return build
+
+
+def prepare_posts(posts):
+    """Attach display data to a page of posts in one pass.
+
+    Sets ``detail_url``, ``author_url``, ``author_name``, ``group_url``
+    and ``pub_date_display`` so list templates need no ``{% url %}``
+    tags or per-post method calls.
+    """
+    detail_url = url_pattern('posts:post_detail', 'post_id')
+    profile_url = url_pattern('posts:profile', 'username')
+    group_url = url_pattern('posts:group_list', 'slug')
+    authors = {}
+    dates = {}
+    for post in posts:
+        author = post.author
+        if author.pk not in authors:
+            authors[author.pk] = (
+                profile_url(author.username), author.get_full_name()
+            )
+        post.author_url, post.author_name = authors[author.pk]
+        post.detail_url = detail_url(post.pk)
+        post.group_url = group_url(post.group.slug) if post.group_id else ''
+        pub_date = post.pub_date
+        if settings.USE_TZ and timezone.is_aware(pub_date):
+            pub_date = timezone.localtime(pub_date)
+        day = pub_date.date()
+        if day not in dates:
+            dates[day] = dateformat.format(pub_date, PUB_DATE_FORMAT)
+        post.pub_date_display = dates[day]
+    return posts
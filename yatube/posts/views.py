@@ -1,65 +1,124 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from .models import Post, Group, User
-from .forms import PostForm
-
-
-NUMBER_OF_ENTIES = 10
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_http_methods
+from .models import (
+    ArchivedPost, EditConflict, Follow, GroupFollow, Post, PostDraft, Group,
+    User
+)
+from .cache import (
+    cache_anonymous_page, group_tags, index_tags, profile_tags
+)
+from .counters import author_counts, author_posts_count
+from .forms import DraftForm, PostForm
+from .paginators import CursorPaginator, MergedCursorPaginator
+from .search import search_posts
+from .timeline import timeline_sources
+from .utils import NUMBER_OF_ENTIES, paginate, prepare_posts
 
 
+@cache_anonymous_page(index_tags)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, NUMBER_OF_ENTIES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = prepare_posts(paginate(request, Post.objects.feed()))
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page(group_tags)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, NUMBER_OF_ENTIES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = prepare_posts(
+        paginate(request, group.posts.feed(), group.posts_count)
+    )
+    following = request.user.is_authenticated and GroupFollow.objects.filter(
+        user=request.user, group=group
+    ).exists()
     context = {
         'group': group,
+        'following': following,
         'page_obj': page_obj,
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_anonymous_page(profile_tags)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author)
-    paginator = Paginator(post_list, NUMBER_OF_ENTIES)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts_count, archived_count = author_counts(author)
+    page_obj = prepare_posts(
+        paginate(request, author.posts.feed(), posts_count)
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     context = {
         "author": author,
+        'posts_count': posts_count,
+        'archived_count': archived_count,
+        'following': following,
         'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def profile_archive(request, username):
+    author = get_object_or_404(User, username=username)
+    paginator = CursorPaginator(
+        author.archived_posts.select_related('author', 'group'),
+        NUMBER_OF_ENTIES
+    )
+    page_obj = prepare_posts(paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    ))
+    context = {
+        'author': author,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/profile_archive.html', context)
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = Post.objects.feed().filter(pk=post_id).first()
+    if post is None:
+        # старые посты переехали в архив, ссылки на них продолжают работать
+        post = get_object_or_404(
+            ArchivedPost.objects.select_related('author', 'group'),
+            pk=post_id
+        )
     context = {
         "post": post,
+        'posts_count': author_posts_count(post.author_id),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        paginator = CursorPaginator(
+            search_posts(Post.objects.feed(), query), NUMBER_OF_ENTIES
+        )
+        page_obj = prepare_posts(paginator.get_cursor_page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        ))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        PostDraft.objects.filter(author=request.user, post=None).delete()
         return redirect('posts:profile', username=request.user.username)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -67,14 +126,112 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post.pk)
-    form = PostForm(request.POST or None, instance=post)
+    version = post.version
+    expected_version = request.POST.get('version', '')
+    expected_version = (
+        int(expected_version) if expected_version.isdigit() else version
+    )
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if form.is_valid():
-        form.save()
-        return redirect('posts:post_detail', post_id=post.pk)
+        try:
+            save_changes(form, expected_version)
+        except EditConflict:
+            form.add_error(
+                None,
+                'Пока вы редактировали пост, его изменили. Проверьте текст '
+                'и сохраните ещё раз, чтобы записать свою версию.'
+            )
+            version = Post.objects.filter(pk=post.pk).values_list(
+                'version', flat=True
+            ).first()
+        else:
+            PostDraft.objects.filter(post=post).delete()
+            return redirect('posts:post_detail', post_id=post.pk)
     context = {
         "form": form,
-        "is_edit": True
+        "is_edit": True,
+        'version': version,
     }
     return render(request, 'posts/create_post.html', context)
+
+
+def save_changes(form, expected_version):
+    """Write only the changed columns of the post.
+
+    Raises ``EditConflict`` if the post is no longer at
+    ``expected_version``, the version the form was opened with.
+    """
+    post = form.save(commit=False)
+    if form.changed_data:
+        post.save(
+            update_fields=form.changed_data, expected_version=expected_version
+        )
+
+
+@login_required
+@require_http_methods(['GET', 'POST'])
+def post_draft(request, post_id=None):
+    """Autosave endpoint: GET returns the draft, POST stores it.
+
+    ``posts_post`` is not written until the post itself is saved.
+    """
+    if post_id is not None and not Post.objects.filter(
+        pk=post_id, author=request.user
+    ).exists():
+        raise Http404
+    if request.method == 'GET':
+        draft = PostDraft.objects.filter(
+            author=request.user, post_id=post_id
+        ).values('text', 'group', 'updated').first()
+        return JsonResponse({'draft': draft})
+    form = DraftForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    draft, _ = PostDraft.objects.update_or_create(
+        author=request.user, post_id=post_id, defaults=form.cleaned_data
+    )
+    return JsonResponse({'updated': draft.updated})
+
+
+@login_required
+def follow_index(request):
+    paginator = MergedCursorPaginator(
+        timeline_sources(request.user), NUMBER_OF_ENTIES
+    )
+    page_obj = prepare_posts(paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    ))
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    Follow.objects.filter(
+        user=request.user, author__username=username
+    ).delete()
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def group_follow(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    GroupFollow.objects.get_or_create(user=request.user, group=group)
+    return redirect('posts:group_list', slug=slug)
+
+
+@login_required
+def group_unfollow(request, slug):
+    GroupFollow.objects.filter(user=request.user, group__slug=slug).delete()
+    return redirect('posts:group_list', slug=slug)
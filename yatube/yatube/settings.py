@@ -41,14 +41,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -57,7 +60,7 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -72,17 +75,149 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при старте (см. settings_production)
+TEMPLATES_PRECOMPILE = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# База выбирается переменными окружения: DB_ENGINE=postgresql или sqlite3.
+# Для PostgreSQL нужен psycopg2 (его нет в requirements.txt, ставится
+# отдельно); DB_POOL_MAX_SIZE > 0 включает пул соединений, а
+# DB_POOL_TIMEOUT задаёт, сколько секунд ждать свободного соединения.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite3')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 0))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': (
+                'core.db.backends.postgresql_pool' if DB_POOL_MAX_SIZE
+                else 'django.db.backends.postgresql'
+            ),
+            'NAME': os.getenv('POSTGRES_DB', 'yatube'),
+            'USER': os.getenv('POSTGRES_USER', 'yatube'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # с пулом соединения возвращаются в пул после каждого запроса
+            'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                'pool_max_size': DB_POOL_MAX_SIZE,
+                'pool_timeout': DB_POOL_TIMEOUT,
+            } if DB_POOL_MAX_SIZE else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': os.getenv(
+                'SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+            ),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # секунды ожидания блокировки записи
+                'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 20)),
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+            },
+        }
     }
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+# Тесты начинаются с пустыми кэшами: id постов повторяются после отката
+TEST_RUNNER = 'core.test_runner.ClearCachesRunner'
+
+# HTML постов в лентах кэшируется по id и версии поста
+POSTS_FRAGMENT_CACHE = 'fragments'
+# Страницы лент для анонимов кэшируются целиком; 0 выключает кэш
+POSTS_PAGE_CACHE = 'default'
+POSTS_PAGE_CACHE_TIMEOUT = int(os.getenv('POSTS_PAGE_CACHE_TIMEOUT', 0))
+# Лента подписок хранит не больше POSTS_TIMELINE_LENGTH постов на читателя.
+# Посты авторов, у которых подписчиков больше POSTS_FANOUT_MAX_FOLLOWERS,
+# не раскладываются по лентам, а подмешиваются при чтении.
+POSTS_TIMELINE_LENGTH = 500
+POSTS_FANOUT_MAX_FOLLOWERS = 1000
+# Массовые действия админки меняют посты пачками по стольку штук
+POSTS_BULK_CHUNK_SIZE = 1000
+# manage.py archive_posts переносит в архив посты старше стольких дней
+POSTS_ARCHIVE_AFTER_DAYS = 365
+
+# Реплики только для чтения: DB_REPLICAS — пути к копиям базы SQLite
+# или хосты реплик PostgreSQL через запятую.
+DATABASE_REPLICAS = []
+for number, location in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(','))
+):
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'postgresql':
+        replica['HOST'] = location
+    else:
+        replica['NAME'] = f'file:{location}?mode=ro'
+        replica['OPTIONS'] = dict(
+            replica['OPTIONS'],
+            journal_mode=None,
+            immediate_transactions=False,
+        )
+    DATABASES[f'replica_{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+# сколько секунд после записи пользователь читает с основной базы
+DATABASE_REPLICA_PIN_SECONDS = 5
+# через сколько секунд снова пробовать недоступную реплику
+DATABASE_REPLICA_RETRY_SECONDS = 30
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+    MIDDLEWARE.insert(2, 'core.middleware.ReplicaPinningMiddleware')
+
+
+# Метрики в формате Prometheus отдаются на /metrics/ только этим адресам
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+METRICS_SLOW_REQUEST_SECONDS = float(
+    os.getenv('METRICS_SLOW_REQUEST_SECONDS', 0.5)
+)
+METRICS_SLOW_REQUEST_QUERIES = int(
+    os.getenv('METRICS_SLOW_REQUEST_QUERIES', 30)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
 }
 
 
@@ -127,6 +262,46 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
 
+# Имена загруженных файлов — хэши содержимого, поэтому их можно
+# отдавать с Cache-Control на год (core.views.media, в бою — nginx)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Миниатюры картинок постов: имя -> (геометрия, опции sorl-thumbnail).
+# Их делает задача сразу после загрузки, а имена и размеры миниатюр
+# sorl хранит в кэше и базе, так что ленты не читают файлы с диска.
+POSTS_THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'feed_2x': ('1920x678', {'crop': 'center'}),
+    'detail': ('960', {}),
+}
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+THUMBNAIL_CACHE = 'default'
+
+
+# Ограничение частоты записи (core.ratelimit): токен-бакеты по
+# пользователю ('user'), адресу ('ip') или на весь маршрут ('route').
+RATELIMIT_ENABLED = True
+RATELIMIT_STORAGE = 'core.ratelimit.CacheStorage'
+RATELIMIT_CACHE = 'default'
+RATELIMIT_ROUTES = {
+    'posts:post_create': [('user', '10/m'), ('ip', '60/m')],
+    'users:signup': [('ip', '5/h'), ('route', '100/m')],
+}
+
+# Фоновые задачи (core.tasks). В режиме TASKS_EAGER задачи выполняются
+# сразу в запросе; TASKS_WORKERS потоков выполняют их в процессе сайта,
+# при 0 задачи только пишутся в очередь для manage.py run_tasks.
+TASKS_EAGER = DEBUG
+TASKS_WORKERS = int(os.getenv('TASKS_WORKERS', 2))
+TASKS_RETRY_DELAY = 5
+TASKS_STALE_SECONDS = 600
+# manage.py run_tasks удаляет выполненные задачи старше стольких секунд;
+# упавшие остаются для разбора
+TASKS_DONE_RETENTION_SECONDS = 60 * 60 * 24
+
+# Лента постов листается по курсору (?after=/?before=) вместо ?page=
+POSTS_CURSOR_PAGINATION = False
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
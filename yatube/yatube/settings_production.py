@@ -0,0 +1,39 @@
+"""Production profile: DJANGO_SETTINGS_MODULE=yatube.settings_production."""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, TEMPLATES
+
+DEBUG = False
+SECRET_KEY = os.environ['SECRET_KEY']
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost').split(',')
+
+# Шаблоны разбираются один раз на процесс и держатся в памяти;
+# при старте компилируются все, ошибка синтаксиса не даст запуститься.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES_PRECOMPILE = True
+
+# Кэш страниц, токены его тегов, бакеты ограничителя и ключи sorl должны
+# быть общими для всех воркеров: сброс тега в одном процессе иначе не
+# дойдёт до остальных. CACHE_MEMCACHED=host:port[,host:port] (нужен
+# python-memcached); без общего кэша кэш страниц выключен.
+CACHE_MEMCACHED = list(
+    filter(None, os.getenv('CACHE_MEMCACHED', '').split(','))
+)
+if CACHE_MEMCACHED:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': CACHE_MEMCACHED,
+    }
+    POSTS_PAGE_CACHE_TIMEOUT = int(
+        os.getenv('POSTS_PAGE_CACHE_TIMEOUT', 60)
+    )
+else:
+    POSTS_PAGE_CACHE_TIMEOUT = 0
+TASKS_EAGER = False